@@ -1,13 +1,26 @@
-import socket
+import time
+STARTED = time.perf_counter()  # Dasar laporan waktu mulai, diambil sebelum import lain
+
+import argparse
+import asyncio
+import importlib.util
 import os
 import sys
-import time
 from colorama import init, Fore, Style
 
-# Coba import library Stegano
-try:
-    from stegano import lsb
-except ImportError:
+import pystegano_engine as engine
+import pystegano_metrics as metrics
+import pystegano_profile as profile
+import pystegano_trace as trace
+from pystegano_config import load_config
+from pystegano_core import capacity_bits, embedded_bits
+from pystegano_discovery import (announce, configure as configure_discovery, discover, format_targets,
+                                 get_local_ip, local_addresses, scan_subnet)
+from pystegano_transport import (DEFAULT_PORT, configure as configure_transport, file_sha256, parse_target,
+                                 receive_once, resolve_targets, send_packet, send_to_many)
+
+# Cek library Stegano (baru di-import saat encode/reveal pertama, karena ikut memuat OpenCV & numpy)
+if importlib.util.find_spec("stegano") is None:
     print("Error: Library 'stegano' belum diinstall.")
     print("Ketik: pip install stegano")
     sys.exit()
@@ -15,22 +28,8 @@ except ImportError:
 # Inisialisasi Colorama
 init(autoreset=True)
 
-# KONFIGURASI DASAR
-SEPARATOR = "<SEPARATOR>"
-BUFFER_SIZE = 4096 # Mengirim 4KB per paket (Layer 4 Segmentation)
-DEFAULT_PORT = 5001
-
-def get_local_ip():
-    """Mendapatkan IP Address lokal perangkat"""
-    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    try:
-        s.connect(('8.8.8.8', 1))
-        IP = s.getsockname()[0]
-    except Exception:
-        IP = '127.0.0.1'
-    finally:
-        s.close()
-    return IP
+# Waktu mulai (diisi main(), ditampilkan di header)
+startup = profile.StartupTimer(STARTED)
 
 def clear_screen():
     os.system('cls' if os.name == 'nt' else 'clear')
@@ -40,7 +39,8 @@ def print_header():
     print(Fore.CYAN + "=" * 60)
     print(Fore.YELLOW + Style.BRIGHT + "      PY-STEGANO: HIDDEN MESSAGE NETWORK")
     print(Fore.CYAN + "=" * 60)
-    print(f"IP Lokal Anda: {Fore.GREEN}{get_local_ip()}")
+    print(f"IP Lokal Anda: {Fore.GREEN}{', '.join(local_addresses()) or get_local_ip()}")
+    print(f"Waktu mulai : {Fore.CYAN}{startup.report()}")
     print("-" * 60)
 
 # --- BAGIAN 1: LOGIKA STEGANOGRAFI (MANIPULASI GAMBAR) ---
@@ -49,71 +49,124 @@ def embed_message(image_path, secret_message):
     """Menyisipkan pesan ke dalam gambar"""
     print(Fore.YELLOW + "\n[Proses] Menyisipkan pesan rahasia ke piksel gambar...")
     try:
-        # Menggunakan algoritma LSB (Least Significant Bit)
-        secret_image = lsb.hide(image_path, secret_message)
-        output_name = os.path.join(os.path.dirname(os.path.abspath(__file__)), "secret_packet.png")
-        secret_image.save(output_name)
+        # Cek kapasitas dulu (hanya header gambar yang dibaca)
+        from PIL import Image
+        with Image.open(image_path) as carrier:
+            kapasitas = capacity_bits(*carrier.size)
+        butuh = embedded_bits(secret_message)
+        if butuh > kapasitas:
+            print(Fore.RED + f"[Gagal] Pesan butuh {butuh // 8:,} byte, gambar hanya muat {kapasitas // 8:,} byte. "
+                             "Pakai gambar yang lebih besar atau pesan yang lebih pendek.")
+            return None
+        with trace.Trace("encode", carrier=os.path.basename(image_path), message_chars=len(secret_message)) as record:
+            # Menggunakan algoritma LSB (Least Significant Bit)
+            with metrics.timed("embed"):
+                secret_image = engine.embed(image_path, secret_message)
+            output_name = os.path.join(os.path.dirname(os.path.abspath(__file__)), "secret_packet.png")
+            with metrics.timed("png_save"):
+                secret_image.save(output_name)
+            if trace.enabled():
+                record.update(sha256=file_sha256(output_name), size=os.path.getsize(output_name))
         print(Fore.GREEN + f"[Sukses] Pesan tersimpan di '{output_name}'")
         return output_name
     except Exception as e:
         print(Fore.RED + f"[Gagal] Error saat encoding: {e}")
         return None
 
+def laporan_profil(baris):
+    """Tampilkan ringkasan profiler (--profile / STEGOVERT_PROFILE=1)"""
+    print(Fore.CYAN + baris)
+
 def extract_message(image_path):
     """Membaca pesan dari gambar"""
     print(Fore.YELLOW + "\n[Proses] Mengekstrak bit rahasia dari gambar...")
     try:
-        clear_message = lsb.reveal(image_path)
+        with trace.Trace("reveal", packet=os.path.basename(image_path)) as record, metrics.timed("reveal"):
+            if trace.enabled():
+                record.update(sha256=file_sha256(image_path))
+            clear_message = engine.extract(image_path)
         return clear_message
     except Exception as e:
         return f"Gagal membaca pesan: {e}"
 
 # --- BAGIAN 2: MODE PENGIRIM (CLIENT) ---
 
-def start_sender():
+def pilih_carrier(carriers, pesan):
+    """Carrier terkecil dari pustaka yang muat untuk pesan (lihat pystegano_carriers)"""
+    from pystegano_carriers import CarrierLibrary
+    print(Fore.YELLOW + "[Proses] Memeriksa pustaka carrier...")
+    library = CarrierLibrary(carriers["dir"], carriers["index"])
+    try:
+        diindeks, dihapus = library.refresh()
+        if diindeks or dihapus:
+            print(Fore.CYAN + f"[Info] {diindeks} carrier diindeks, {dihapus} dihapus, {len(library)} siap pakai")
+        carrier = library.best_fit_for(pesan)
+    finally:
+        library.close()
+    if not carrier:
+        print(Fore.RED + "[Gagal] Tidak ada carrier di pustaka yang muat untuk pesan ini.")
+        return None
+    print(Fore.GREEN + f"[Carrier] {carrier['path']} ({carrier['width']}x{carrier['height']})")
+    return carrier["path"]
+
+def start_sender(groups=None, carriers=None):
     print(Fore.MAGENTA + "\n--- MODE PENGIRIM (SENDER) ---")
     
     # 1. Input Gambar & Pesan
-    image_name = input(Fore.WHITE + "Masukkan nama file gambar (contoh: sampel.png): ")
-    if not os.path.exists(image_name):
+    otomatis = bool(carriers and carriers["dir"])
+    image_name = input(Fore.WHITE + "Masukkan nama file gambar (contoh: sampel.png"
+                       + (", kosongkan untuk memilih dari pustaka carrier" if otomatis else "") + "): ")
+    if not (otomatis and not image_name.strip()) and not os.path.exists(image_name):
         print(Fore.RED + "File gambar tidak ditemukan!")
         input("Tekan Enter...")
         return
 
     pesan = input(Fore.WHITE + "Masukkan PESAN RAHASIA: ")
+    if not image_name.strip():
+        image_name = pilih_carrier(carriers, pesan)
+        if not image_name:
+            input("Tekan Enter...")
+            return
     
     # 2. Proses Steganografi
-    ready_file = embed_message(image_name, pesan)
+    ready_file = profile.wrap("encode", embed_message, laporan_profil)(image_name, pesan)
     if not ready_file: return
 
     # 3. Koneksi Jaringan (Layer 4 & 3)
-    target_ip = input(Fore.WHITE + "\nMasukkan IP Tujuan (Receiver): ")
+    target_ip = input(Fore.WHITE + "\nMasukkan IP Tujuan (Receiver, pisahkan dengan koma atau nama grup,\n"
+                                   "kosongkan untuk mencari receiver di LAN): ")
+    if not target_ip.strip():
+        target_ip = cari_receiver()
+        if not target_ip:
+            input("Tekan Enter untuk kembali...")
+            return
+    targets = resolve_targets(target_ip, groups)
+    if len(targets) > 1:
+        send_to_group(targets, ready_file, image_name)
+        input("Tekan Enter untuk kembali...")
+        return
+    if not targets:
+        print(Fore.RED + "[!] Alamat tujuan tidak valid!")
+        input("Tekan Enter untuk kembali...")
+        return
     
     try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM) # TCP Socket
-        print(f"{Fore.YELLOW}[Network] Menghubungkan ke {target_ip}:{DEFAULT_PORT}...")
-        s.connect((target_ip, DEFAULT_PORT))
-        print(f"{Fore.GREEN}[Network] Terhubung!")
+        # 4. Protokol Pengiriman File (header + data biner, lihat pystegano_transport)
+        host, port = parse_target(targets[0], DEFAULT_PORT)
+        print(f"{Fore.YELLOW}[Network] Menghubungkan ke {host}:{port}...")
+        print(f"{Fore.YELLOW}[Transfer] Mengirim paket data...")
+        def on_retry(attempt, exc):
+            print(Fore.YELLOW + f"[Network] Koneksi terputus ({exc}), melanjutkan kiriman (percobaan {attempt})...")
 
-        # 4. Protokol Pengiriman File
-        filesize = os.path.getsize(ready_file)
-        
-        # Kirim Header dulu: "NamaFile<SEPARATOR>Ukuran"
-        s.send(f"{ready_file}{SEPARATOR}{filesize}".encode())
-        time.sleep(1) # Beri jeda agar receiver siap
+        def on_stage(stage, nbytes):
+            if stage == "delta":
+                print(Fore.YELLOW + f"[Transfer] Receiver sudah punya gambar carrier, hanya mengirim delta {nbytes} byte")
+            elif stage == "carrier":
+                print(Fore.YELLOW + f"[Transfer] Menyimpan gambar carrier di receiver ({nbytes} byte)...")
 
-        # Kirim File (Binary)
-        print(f"{Fore.YELLOW}[Transfer] Mengirim paket data...")
-        with open(ready_file, "rb") as f:
-            while True:
-                # Membaca file dalam potongan 4KB (Chunking)
-                bytes_read = f.read(BUFFER_SIZE)
-                if not bytes_read:
-                    break
-                s.sendall(bytes_read)
-        
+        kirim = profile.wrap("send", send_packet, laporan_profil)
+        asyncio.run(kirim(host, port, ready_file, image_name, on_retry=on_retry, on_stage=on_stage))
         print(f"{Fore.GREEN}[Sukses] File berhasil dikirim.")
-        s.close()
         
         # Hapus file temporary agar jejak hilang (Opsional)
         # os.remove(ready_file) 
@@ -123,52 +176,82 @@ def start_sender():
     
     input("Tekan Enter untuk kembali...")
 
+def cari_receiver():
+    """Cari receiver di LAN lewat broadcast UDP, lalu pilih tujuan"""
+    print(Fore.YELLOW + "[Network] Mencari receiver di LAN...")
+    receivers = asyncio.run(discover())
+    if not receivers:
+        # Broadcast bisa diblokir router/firewall: pindai subnet lokal satu per satu
+        print(Fore.YELLOW + "[Network] Tidak ada jawaban broadcast, memindai subnet lokal...")
+        receivers = [(host, DEFAULT_PORT, f"protokol v{version}")
+                     for host, version in asyncio.run(scan_subnet())]
+    if not receivers:
+        print(Fore.RED + "[!] Tidak ada receiver yang ditemukan.")
+        return ""
+    for nomor, (host, port, name) in enumerate(receivers, 1):
+        print(f"  {nomor}. {Fore.GREEN}{host}:{port}{Fore.WHITE} ({name})")
+    pilihan = input(Fore.WHITE + "Pilih nomor receiver (Enter = semua): ").strip()
+    if pilihan.isdigit() and 1 <= int(pilihan) <= len(receivers):
+        receivers = [receivers[int(pilihan) - 1]]
+    return format_targets(receivers, DEFAULT_PORT)
+
+def send_to_group(targets, ready_file, image_name):
+    """Kirim satu paket ke banyak receiver sekaligus"""
+    print(f"{Fore.YELLOW}[Transfer] Mengirim paket ke {len(targets)} receiver sekaligus...")
+
+    def on_result(target, exc):
+        if exc is None:
+            print(Fore.GREEN + f"[Sukses] {target}")
+        else:
+            print(Fore.RED + f"[Gagal] {target}: {str(exc) or type(exc).__name__}")
+
+    kirim = profile.wrap("send", send_to_many, laporan_profil)
+    results = asyncio.run(kirim(targets, ready_file, image_name, on_result=on_result))
+    gagal = sum(isinstance(hasil, Exception) for hasil in results.values())
+    warna = Fore.GREEN if not gagal else Fore.YELLOW
+    print(warna + f"[Selesai] {len(targets) - gagal}/{len(targets)} receiver menerima paket.")
+
 # --- BAGIAN 3: MODE PENERIMA (SERVER) ---
 
 def start_receiver():
     print(Fore.MAGENTA + "\n--- MODE PENERIMA (RECEIVER) ---")
     
-    # 1. Setup Server Socket
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    s.bind(("0.0.0.0", DEFAULT_PORT)) # Bind ke semua interface
-    s.listen(1)
-    
+    # 1. Setup Server (bind ke semua interface) & tunggu satu kiriman
     my_ip = get_local_ip()
     print(Fore.CYAN + f"[*] Menunggu kiriman di {my_ip}:{DEFAULT_PORT}...")
 
-    # 2. Menerima Koneksi
-    client_socket, address = s.accept()
-    print(Fore.GREEN + f"[+] Koneksi diterima dari {address[0]}")
-
-    # 3. Menerima Header File
-    received = client_socket.recv(BUFFER_SIZE).decode()
-    filename, filesize = received.split(SEPARATOR)
-    filename = "diterima_" + os.path.basename(filename) # Rename agar tidak menimpa
-    received_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "received")
-    os.makedirs(received_dir, exist_ok=True)
-    filepath = os.path.join(received_dir, filename)
-    filesize = int(filesize)
-
-    # 4. Menerima Binary Data
-    print(f"{Fore.YELLOW}[Transfer] Menerima file: {filename} ({filesize} bytes)...")
-    
-    with open(filepath, "wb") as f:
-        bytes_received = 0
-        while bytes_received < filesize:
-            bytes_read = client_socket.recv(BUFFER_SIZE)
-            if not bytes_read:    
-                break
-            f.write(bytes_read)
-            bytes_received += len(bytes_read)
-
-    print(Fore.GREEN + f"[Sukses] File tersimpan: {filepath}")
-    client_socket.close()
-    s.close()
-
-    # 5. Decode Pesan Rahasia
+    def on_connect(peer):
+        print(Fore.GREEN + f"[+] Koneksi diterima dari {peer}")
+        print(f"{Fore.YELLOW}[Transfer] Menerima file...")
+
+    def on_error(peer, exc):
+        print(Fore.RED + f"[!] Kiriman dari {peer} gagal: {exc}")
+        print(Fore.CYAN + f"[*] Menunggu kiriman ulang di {my_ip}:{DEFAULT_PORT}...")
+
+    async def terima():
+        # Jawab pencarian receiver dari sender selama menunggu
+        responder = asyncio.ensure_future(announce(DEFAULT_PORT))
+        responder.add_done_callback(lambda task: task.cancelled() or task.exception())
+        try:
+            return await receive_once(port=DEFAULT_PORT, prefix="diterima_", on_connect=on_connect,
+                                      on_error=on_error)
+        finally:
+            responder.cancel()
+
+    try:
+        filepath, filesize, digest = asyncio.run(profile.wrap("receive", terima, laporan_profil)())
+    except Exception as e:
+        print(Fore.RED + f"[Error] Jaringan bermasalah: {e}")
+        input("Tekan Enter untuk kembali...")
+        return
+
+    print(Fore.GREEN + f"[Sukses] File tersimpan: {filepath} ({filesize} bytes)")
+    print(Fore.GREEN + f"[Integritas] SHA-256 cocok: {digest}")
+
+    # 2. Decode Pesan Rahasia
     choice = input(Fore.WHITE + "\nApakah Anda ingin membuka pesan rahasia sekarang? (y/n): ")
     if choice.lower() == 'y':
-        rahasia = extract_message(filepath)
+        rahasia = profile.wrap("reveal", extract_message, laporan_profil)(filepath)
         print(Fore.CYAN + "=" * 40)
         print(Fore.RED + "PESAN RAHASIA TERDETEKSI:")
         print(Fore.WHITE + Style.BRIGHT + rahasia)
@@ -178,7 +261,36 @@ def start_receiver():
 
 # --- MENU UTAMA ---
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="PY-STEGANO: Hidden Message Network")
+    parser.add_argument("--streams", help="Jumlah koneksi paralel per paket (angka atau 'auto')")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profil CPU setiap encode/kirim/terima/reveal (file .prof di folder profiles/)")
+    parser.add_argument("--trace-file", help="Tulis catatan JSONL per encode/kirim/terima/reveal ke file ini")
+    parser.add_argument("--metrics-port", type=int, help="Sajikan metrik Prometheus di port ini (http://127.0.0.1:PORT/metrics)")
+    return parser.parse_args()
+
 def main():
+    startup.mark("import")
+    args = parse_args()
+    config = load_config()
+    configure_transport(config["transport"])
+    engine.configure(config["engine"])
+    configure_discovery(config["discovery"])
+    if args.streams:
+        configure_transport({"streams": args.streams})
+    metrics.configure(config["metrics"])
+    trace.configure(config["trace"])
+    profile.configure(config["profile"])
+    if args.profile:
+        profile.configure({"enabled": True})
+    if args.trace_file:
+        trace.configure({"file": args.trace_file})
+    try:
+        metrics.start_http_server(args.metrics_port)
+    except OSError as e:
+        print(Fore.RED + f"[Metrik] Port metrik tidak bisa dibuka: {e}")
+    startup.mark("konfigurasi")
     while True:
         print_header()
         print("Pilih Peran Anda:")
@@ -189,7 +301,7 @@ def main():
         pilihan = input(Fore.YELLOW + "\n[?] Masukkan Pilihan: ")
         
         if pilihan == '1':
-            start_sender()
+            start_sender(config["groups"], config["carriers"])
         elif pilihan == '2':
             start_receiver()
         elif pilihan == '0':
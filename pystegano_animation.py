@@ -0,0 +1,155 @@
+"""
+STEGOVERT - Animation Scheduler
+Satu penjadwal frame untuk semua efek animasi UI; berjalan hanya saat ada efek aktif dan jendela terlihat.
+"""
+
+import logging
+import math
+import time
+
+log = logging.getLogger("stegovert.animation")
+
+
+class Effect:
+    """One registered animation: step(elapsed) is called every frame with the seconds
+    since it started and returns False when finished. on_stop() restores the widget."""
+    def __init__(self, step, duration=None, on_stop=None):
+        self.step = step
+        self.duration = duration
+        self.on_stop = on_stop
+        self.started = time.monotonic()
+        self.frames = 0
+        self.cost = 0.0  # Seconds spent in step(), for the debug report
+        self.worst = 0.0
+
+
+class AnimationScheduler:
+    """Drives every UI animation from a single Tk after() chain.
+
+    Widgets register effects with start(name, step); the chain only exists while at
+    least one effect is running and the window is mapped. With nothing to animate, or
+    while the window is minimised, no callback is scheduled at all; a <Map> event
+    resumes the effects that are still registered.
+
+    With debug=True, the cost of each frame (and of each effect in it) is measured and
+    a summary goes to report(line) every report_interval seconds and when the
+    scheduler goes idle.
+    """
+    def __init__(self, window, fps=20, debug=False, report=None, report_interval=5.0):
+        self.window = window
+        self.interval = max(1, int(1000 / fps))
+        self.debug = debug
+        self.report = report or log.debug
+        self.report_interval = report_interval
+        self._effects = {}
+        self._pending = None  # after() id of the next frame, None while asleep
+        self._stats = {"frames": 0, "cost": 0.0, "worst": 0.0, "late": 0}
+        self._last_report = time.monotonic()
+        window.bind("<Map>", self._on_map, add="+")
+
+    @property
+    def active(self):
+        return bool(self._effects)
+
+    def start(self, name, step, duration=None, on_stop=None):
+        """Run step(elapsed) every frame until it returns False, duration seconds pass
+        or stop(name) is called. Starting a running name restarts it."""
+        self.stop(name)
+        self._effects[name] = Effect(step, duration, on_stop)
+        self._wake()
+
+    def stop(self, name):
+        """Remove an effect and call its on_stop (a no-op if it is not running)"""
+        effect = self._effects.pop(name, None)
+        if effect and effect.on_stop:
+            effect.on_stop()
+        if not self._effects:
+            self._sleep()
+
+    def stop_all(self):
+        for name in list(self._effects):
+            self.stop(name)
+
+    def running(self, name):
+        return name in self._effects
+
+    def _visible(self):
+        try:
+            return self.window.winfo_viewable() and self.window.state() != "iconic"
+        except Exception:
+            return False  # Window already destroyed
+
+    def _wake(self):
+        if self._pending is None and self._effects and self._visible():
+            self._pending = self.window.after(self.interval, self._frame)
+
+    def _sleep(self):
+        if self._pending is not None:
+            self.window.after_cancel(self._pending)
+            self._pending = None
+        if self.debug and self._stats["frames"]:
+            self._report()
+
+    def _on_map(self, event):
+        if event.widget is self.window:
+            self._wake()
+
+    def _frame(self):
+        self._pending = None
+        if not self._visible():
+            return  # Minimised: sleep until <Map>
+        started = time.perf_counter()
+        now = time.monotonic()
+        finished = []
+        for name, effect in list(self._effects.items()):
+            elapsed = now - effect.started
+            step_started = time.perf_counter()
+            if (effect.duration is not None and elapsed >= effect.duration) or effect.step(elapsed) is False:
+                finished.append((name, effect))
+            if self.debug:
+                cost = time.perf_counter() - step_started
+                effect.frames += 1
+                effect.cost += cost
+                effect.worst = max(effect.worst, cost)
+        if self.debug:
+            self._account(time.perf_counter() - started)
+        for name, effect in finished:
+            if self._effects.get(name) is effect:
+                self.stop(name)
+        self._wake()
+
+    def _account(self, cost):
+        stats = self._stats
+        stats["frames"] += 1
+        stats["cost"] += cost
+        stats["worst"] = max(stats["worst"], cost)
+        if cost * 1000 > self.interval:
+            stats["late"] += 1  # The frame took longer than the frame interval itself
+        if time.monotonic() - self._last_report >= self.report_interval:
+            self._report()
+
+    def _report(self):
+        stats = self._stats
+        frames = stats["frames"]
+        per_effect = ", ".join(
+            f"{name} {effect.cost / effect.frames * 1000:.2f}/{effect.worst * 1000:.2f} ms"
+            for name, effect in self._effects.items() if effect.frames)
+        self.report(f"[~] Animation: {frames} frames, avg {stats['cost'] / frames * 1000:.2f} ms, "
+                    f"max {stats['worst'] * 1000:.2f} ms, over budget {stats['late']}"
+                    + (f" ({per_effect})" if per_effect else ""))
+        self._stats = {"frames": 0, "cost": 0.0, "worst": 0.0, "late": 0}
+        self._last_report = time.monotonic()
+        for effect in self._effects.values():
+            effect.frames, effect.cost, effect.worst = 0, 0.0, 0.0
+
+
+def pulse(elapsed, period=1.2):
+    """0..1..0 intensity of a pulse, elapsed seconds into it"""
+    return (1 - math.cos(2 * math.pi * elapsed / period)) / 2
+
+
+def blend(color_a, color_b, amount):
+    """Mix two "#rrggbb" colours; amount 0 gives color_a, 1 gives color_b"""
+    a = [int(color_a[i:i + 2], 16) for i in (1, 3, 5)]
+    b = [int(color_b[i:i + 2], 16) for i in (1, 3, 5)]
+    return "#" + "".join(f"{round(x + (y - x) * amount):02x}" for x, y in zip(a, b))
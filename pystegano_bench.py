@@ -0,0 +1,313 @@
+"""
+STEGOVERT - Benchmark
+Benchmark offline untuk embed/reveal, enkripsi dan transport loopback, dengan hasil JSON dan perbandingan baseline.
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import platform
+import random
+import statistics
+import string
+import subprocess
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+import pystegano_engine
+from pystegano_core import decrypt_message, encrypt_message
+
+# ===================== KONFIGURASI =====================
+PROFILES = {
+    # carrier megapixels, payload sizes ("capacity" = the largest message that fits), repeats,
+    # transport file sizes (bytes), latency round trips
+    "quick": {"megapixels": (0.3,), "payloads": (1024, 16384), "repeat": 1,
+              "transfers": (1024 * 1024, 16 * 1024 * 1024), "round_trips": 20},
+    "default": {"megapixels": (0.3, 1, 4), "payloads": (1024, 16384, 262144, "capacity"), "repeat": 3,
+                "transfers": (1024 * 1024, 16 * 1024 * 1024, 64 * 1024 * 1024), "round_trips": 50},
+    "full": {"megapixels": (0.3, 1, 4, 12, 25, 50, 100), "payloads": (1024, 16384, 262144, 4194304, "capacity"),
+             "repeat": 3, "transfers": (1024 * 1024, 16 * 1024 * 1024, 256 * 1024 * 1024), "round_trips": 200},
+}
+CRYPTO_SIZES = (1024, 65536, 1024 * 1024)
+TRANSFER_STREAMS = (1, 4)
+SEED = 20240601  # Carriers and payloads are identical on every run
+REGRESSION_THRESHOLD = 0.15  # Median slowdown that compare flags
+
+
+def _stegano_engine():
+    from stegano import lsb
+    return lsb.hide, lsb.reveal
+
+
+def _numpy_engine(workers=1):
+    return (functools.partial(pystegano_engine.hide, workers=workers),
+            functools.partial(pystegano_engine.reveal, workers=workers))
+
+
+# name -> factory returning (hide(image, message) -> image, reveal(image) -> message).
+# numpy-parallel only splits messages covering engine.parallel_min_pixels or more.
+ENGINES = {"stegano": _stegano_engine, "numpy": _numpy_engine,
+           "numpy-parallel": lambda: _numpy_engine(os.cpu_count() or 1)}
+
+
+# ===================== INPUTS =====================
+def synthetic_carrier(megapixels, seed=SEED):
+    """Noise RGB image of about megapixels (4:3), the same for a given size and seed"""
+    width = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    height = int(megapixels * 1e6 / width)
+    data = random.Random(f"{seed}:{width}x{height}").randbytes(width * height * 3)
+    return Image.frombytes("RGB", (width, height), data)
+
+
+def synthetic_message(size, seed=SEED):
+    return "".join(random.Random(f"{seed}:{size}").choices(string.ascii_letters + string.digits, k=size))
+
+
+def capacity(image):
+    """Longest message stegano's LSB layout fits: "<length>:" plus 8 bits per character,
+    3 bits per pixel"""
+    chars = image.width * image.height * 3 // 8
+    return chars - len(str(chars)) - 1
+
+
+def _size_label(nbytes):
+    for unit, scale in (("MB", 1024 * 1024), ("KB", 1024)):
+        if nbytes >= scale:
+            return f"{nbytes / scale:g}{unit}"
+    return f"{nbytes}B"
+
+
+def measure(func, repeat, setup=None):
+    """Run func repeat times (setup() output passed in, not timed). Returns (runs, last result)"""
+    runs, result = [], None
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        started = time.perf_counter()
+        result = func(arg) if setup else func()
+        runs.append(time.perf_counter() - started)
+    return runs, result
+
+
+def _entry(suite, name, runs, **fields):
+    entry = {"suite": suite, "name": name, "seconds": statistics.median(runs), "min": min(runs), "runs": runs}
+    entry.update(fields)
+    return entry
+
+
+# ===================== SUITES =====================
+def bench_engines(profile, engines, report):
+    for engine_name in engines:
+        hide, reveal = ENGINES[engine_name]()
+        for megapixels in profile["megapixels"]:
+            carrier = synthetic_carrier(megapixels)
+            fits = capacity(carrier)
+            sizes = sorted({fits if size == "capacity" else size for size in profile["payloads"]})
+            for size in (size for size in sizes if size <= fits):
+                message = synthetic_message(size)
+                label = f"{megapixels:g}MP/{'capacity' if size == fits else _size_label(size)}"
+                runs, packet = measure(lambda image: hide(image, message), profile["repeat"], carrier.copy)
+                report(_entry("embed", f"embed/{engine_name}/{label}", runs, engine=engine_name,
+                              megapixels=megapixels, payload=size, chars_per_s=size / statistics.median(runs)))
+                runs, revealed = measure(lambda image: reveal(image), profile["repeat"], packet.copy)  # lsb.reveal closes it
+                if revealed != message:
+                    raise AssertionError(f"{engine_name} reveal returned a different message at {label}")
+                report(_entry("reveal", f"reveal/{engine_name}/{label}", runs, engine=engine_name,
+                              megapixels=megapixels, payload=size, chars_per_s=size / statistics.median(runs)))
+
+
+def bench_crypto(profile, report):
+    for size in CRYPTO_SIZES:
+        message = synthetic_message(size)
+        runs, encrypted = measure(lambda: encrypt_message(message, "benchmark"), profile["repeat"])
+        report(_entry("crypto", f"encrypt/{_size_label(size)}", runs, payload=size,
+                      mb_per_s=size / 1e6 / statistics.median(runs)))
+        runs, decrypted = measure(lambda: decrypt_message(encrypted, "benchmark"), profile["repeat"])
+        if decrypted != message:
+            raise AssertionError("decrypt_message did not round-trip")
+        report(_entry("crypto", f"decrypt/{_size_label(size)}", runs, payload=size,
+                      mb_per_s=size / 1e6 / statistics.median(runs)))
+
+
+async def _bench_transport(profile, report, workdir):
+    from pystegano_transport import MIN_RANGE_SIZE, send_file, serve
+
+    listening = asyncio.get_running_loop().create_future()
+    stop = asyncio.Event()
+    server = asyncio.ensure_future(serve(
+        "127.0.0.1", 0, os.path.join(workdir, "received"), stop=stop,
+        on_listening=lambda host, port: listening.set_result(port)))
+    done, _ = await asyncio.wait({server, listening}, return_when=asyncio.FIRST_COMPLETED)
+    if server in done:
+        server.result()  # Could not listen
+    port = listening.result()
+    try:
+        for size in profile["transfers"]:
+            path = os.path.join(workdir, f"transfer-{size}.bin")
+            with open(path, "wb") as f:
+                f.write(random.Random(size).randbytes(size))
+            for streams in TRANSFER_STREAMS:
+                if streams > 1 and size // MIN_RANGE_SIZE < 2:
+                    continue  # send_file would fall back to a single stream
+                runs = []
+                for _ in range(profile["repeat"]):
+                    started = time.perf_counter()
+                    await send_file("127.0.0.1", port, path, streams=streams)
+                    runs.append(time.perf_counter() - started)
+                report(_entry("transport", f"send/{_size_label(size)}/x{streams}", runs, payload=size,
+                              streams=streams, mb_per_s=size / 1e6 / statistics.median(runs)))
+
+        path = os.path.join(workdir, "latency.bin")
+        with open(path, "wb") as f:
+            f.write(random.Random(0).randbytes(1024))
+        runs = []
+        for _ in range(profile["round_trips"]):
+            started = time.perf_counter()
+            await send_file("127.0.0.1", port, path, streams=1)
+            runs.append(time.perf_counter() - started)
+        ordered = sorted(runs)
+        report(_entry("transport", "latency/1KB", runs, payload=1024,
+                      p95=ordered[int(len(ordered) * 0.95) - 1], max=ordered[-1]))
+    finally:
+        stop.set()
+        await server
+
+
+def bench_transport(profile, report):
+    with tempfile.TemporaryDirectory(prefix="stegovert-bench-") as workdir:
+        asyncio.run(_bench_transport(profile, report, workdir))
+
+
+# ===================== ENVIRONMENT =====================
+def _version(package):
+    try:
+        from importlib.metadata import version
+        return version(package)
+    except Exception:
+        return None
+
+
+def environment():
+    """Machine, interpreter, library versions and code revision behind a result file"""
+    from pystegano_transport import SETTINGS as TRANSPORT
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "packages": {name: _version(name) for name in ("stegano", "Pillow", "numpy")},
+        "commit": commit,
+        "transport": dict(TRANSPORT),
+    }
+
+
+# ===================== COMMANDS =====================
+def run(args):
+    profile = dict(PROFILES[args.profile])
+    if args.repeat:
+        profile["repeat"] = args.repeat
+    if args.megapixels:
+        profile["megapixels"] = tuple(args.megapixels)
+    suites = args.suites or ["embed", "crypto", "transport"]
+    results = []
+
+    def report(entry):
+        results.append(entry)
+        extra = ""
+        for key, unit in (("chars_per_s", "char/s"), ("mb_per_s", "MB/s")):
+            if key in entry:
+                extra = f"  {entry[key]:,.0f} {unit}" if entry[key] >= 100 else f"  {entry[key]:.2f} {unit}"
+        print(f"{entry['name']:<40} {entry['seconds'] * 1000:>11.2f} ms{extra}", flush=True)
+
+    if "embed" in suites:
+        bench_engines(profile, args.engines or list(ENGINES), report)
+    if "crypto" in suites:
+        bench_crypto(profile, report)
+    if "transport" in suites:
+        bench_transport(profile, report)
+
+    output = args.output or f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "profile": args.profile, "results": results}, f, indent=2)
+    print(f"\nHasil disimpan di {output}")
+
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """(name, baseline seconds, current seconds, change, flag) for every benchmark in either file.
+    flag is "REGRESSION", "faster", "new", "missing" or ""."""
+    before = {entry["name"]: entry for entry in baseline["results"]}
+    after = {entry["name"]: entry for entry in current["results"]}
+    rows = []
+    for name in list(before) + [name for name in after if name not in before]:
+        old, new = before.get(name), after.get(name)
+        if old is None or new is None:
+            rows.append((name, old and old["seconds"], new and new["seconds"], None, "new" if old is None else "missing"))
+            continue
+        change = new["seconds"] / old["seconds"] - 1 if old["seconds"] else 0.0
+        flag = "REGRESSION" if change > threshold else "faster" if change < -threshold else ""
+        rows.append((name, old["seconds"], new["seconds"], change, flag))
+    return rows
+
+
+def compare_command(args):
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = json.load(f)
+    for side, data in (("baseline", baseline), ("current", current)):
+        env = data["environment"]
+        print(f"{side:<8} {env['time']}  {env['platform']}  Python {env['python']}  commit {env['commit']}")
+    print()
+    rows = compare(baseline, current, args.threshold)
+    for name, old, new, change, flag in rows:
+        old_text = f"{old * 1000:.2f} ms" if old is not None else "-"
+        new_text = f"{new * 1000:.2f} ms" if new is not None else "-"
+        change_text = f"{change:+.1%}" if change is not None else ""
+        print(f"{name:<40} {old_text:>13} {new_text:>13} {change_text:>8}  {flag}")
+    regressions = sum(1 for row in rows if row[4] == "REGRESSION")
+    print(f"\n{regressions} regresi (ambang {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="STEGOVERT benchmark (offline)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Jalankan benchmark dan simpan hasil JSON")
+    run_parser.add_argument("--profile", choices=sorted(PROFILES), default="default",
+                            help="quick (beberapa detik), default, atau full (carrier sampai 100 MP)")
+    run_parser.add_argument("--suite", dest="suites", action="append", choices=["embed", "crypto", "transport"],
+                            help="Hanya suite ini (bisa diulang)")
+    run_parser.add_argument("--engine", dest="engines", action="append", choices=sorted(ENGINES),
+                            help="Hanya engine LSB ini (bisa diulang)")
+    run_parser.add_argument("--megapixels", type=float, nargs="+", help="Ukuran carrier (MP), mengganti profil")
+    run_parser.add_argument("--repeat", type=int, help="Jumlah pengulangan tiap pengukuran")
+    run_parser.add_argument("--output", "-o", help="File hasil (default: bench-<waktu>.json)")
+
+    compare_parser = commands.add_parser("compare", help="Bandingkan hasil dengan baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                                help="Perlambatan median yang dianggap regresi (0.15 = 15%%)")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        run(args)
+    else:
+        sys.exit(compare_command(args))
+
+
+if __name__ == "__main__":
+    main()
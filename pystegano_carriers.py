@@ -0,0 +1,157 @@
+"""
+STEGOVERT - Carrier Library
+Indeks folder gambar carrier (ukuran, mode, kapasitas pasti, hash) dan pemilihan carrier terkecil yang muat.
+"""
+
+import argparse
+import bisect
+import os
+import sqlite3
+import threading
+import time
+
+from PIL import Image
+
+from pystegano_core import capacity_bits, embedded_bits
+from pystegano_transport import file_sha256
+
+INDEX_NAME = ".stegovert-carriers.sqlite3"
+IMAGE_EXTENSIONS = (".png", ".bmp", ".jpg", ".jpeg")
+USABLE_MODES = ("RGB", "RGBA")  # stegano stops to ask on the console before converting other modes
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS carriers (
+    path           TEXT PRIMARY KEY,  -- relative to the library directory
+    size           INTEGER NOT NULL,
+    mtime_ns       INTEGER NOT NULL,
+    width          INTEGER NOT NULL,
+    height         INTEGER NOT NULL,
+    mode           TEXT,              -- NULL when the file could not be read as an image
+    capacity_bits  INTEGER NOT NULL,
+    sha256         TEXT
+);
+CREATE INDEX IF NOT EXISTS carriers_capacity ON carriers(capacity_bits, size);
+"""
+
+
+def probe(path):
+    """Index row values of one image file; only the image header is decoded"""
+    stat = os.stat(path)
+    try:
+        with Image.open(path) as img:
+            (width, height), mode = img.size, img.mode
+    except Exception:
+        return stat.st_size, stat.st_mtime_ns, 0, 0, None, 0, None  # Kept so it is not re-read every refresh
+    return stat.st_size, stat.st_mtime_ns, width, height, mode, capacity_bits(width, height), file_sha256(path)
+
+
+class CarrierLibrary:
+    """A directory of carrier images indexed in SQLite, with a best-fit lookup.
+
+    refresh() re-reads only files that are new or whose size/mtime changed and drops
+    deleted ones. Usable carriers (RGB/RGBA) are also kept in memory sorted by capacity,
+    so best_fit() is a bisect and never touches the disk.
+    """
+    def __init__(self, directory, index_path=None):
+        self.directory = os.path.abspath(directory)
+        self.index_path = index_path or os.path.join(self.directory, INDEX_NAME)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.index_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._capacities = []
+        self._entries = []
+        self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _scan(self):
+        """{relative path: full path} of every image under the directory"""
+        found = {}
+        for root, dirs, files in os.walk(self.directory):
+            for name in files:
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    found[os.path.relpath(path, self.directory)] = path
+        return found
+
+    def refresh(self):
+        """Bring the index up to date with the directory. Returns (indexed, removed) counts"""
+        with self._lock:
+            known = {row["path"]: (row["size"], row["mtime_ns"])
+                     for row in self._db.execute("SELECT path, size, mtime_ns FROM carriers")}
+        found = self._scan()
+        changed = []
+        for relative, path in found.items():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # Deleted while scanning
+            if known.get(relative) != (stat.st_size, stat.st_mtime_ns):
+                changed.append((relative,) + probe(path))
+        removed = [(relative,) for relative in known.keys() - found.keys()]
+        if changed or removed:
+            with self._lock, self._db:
+                self._db.executemany("INSERT OR REPLACE INTO carriers VALUES (?, ?, ?, ?, ?, ?, ?, ?)", changed)
+                self._db.executemany("DELETE FROM carriers WHERE path = ?", removed)
+            self._load()
+        return len(changed), len(removed)
+
+    def _load(self):
+        placeholders = ", ".join("?" * len(USABLE_MODES))
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT * FROM carriers WHERE mode IN ({placeholders}) ORDER BY capacity_bits, size",
+                USABLE_MODES).fetchall()
+        entries = [dict(row, path=os.path.join(self.directory, row["path"])) for row in rows]
+        # Swapped in one step: best_fit() on another thread sees the old or the new list
+        self._capacities, self._entries = [entry["capacity_bits"] for entry in entries], entries
+
+    def entries(self):
+        """Usable carriers, smallest capacity first"""
+        return list(self._entries)
+
+    def best_fit(self, needed_bits):
+        """The smallest usable carrier (by capacity, then file size) holding needed_bits, or None"""
+        capacities, entries = self._capacities, self._entries
+        index = bisect.bisect_left(capacities, needed_bits)
+        return entries[index] if index < len(entries) else None
+
+    def best_fit_for(self, message, password=None):
+        """best_fit() for a message as the encoder would embed it"""
+        return self.best_fit(embedded_bits(message, password))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# ===================== CLI =====================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Indeks pustaka carrier STEGOVERT dan pilih carrier yang muat")
+    parser.add_argument("directory", help="Folder gambar carrier")
+    parser.add_argument("--index", help=f"File indeks (default: {INDEX_NAME} di folder carrier)")
+    parser.add_argument("--fit", type=int, metavar="BYTE", help="Cari carrier terkecil untuk pesan sebesar ini")
+    args = parser.parse_args(argv)
+
+    library = CarrierLibrary(args.directory, args.index)
+    started = time.perf_counter()
+    indexed, removed = library.refresh()
+    print(f"{len(library)} carrier siap ({indexed} diindeks ulang, {removed} dihapus, "
+          f"{time.perf_counter() - started:.2f} s)")
+    if args.fit is not None:
+        started = time.perf_counter()
+        carrier = library.best_fit(embedded_bits("x" * args.fit))
+        elapsed = time.perf_counter() - started
+        if carrier:
+            print(f"{carrier['path']}  {carrier['width']}x{carrier['height']}  "
+                  f"{carrier['capacity_bits'] // 8:,} byte  ({elapsed * 1e6:.1f} µs)")
+        else:
+            print(f"Tidak ada carrier yang muat {args.fit:,} byte")
+    library.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+STEGOVERT - Konfigurasi
+Membaca stegovert.json (atau file di STEGOVERT_CONFIG) dan menggabungkannya dengan nilai default.
+"""
+
+import copy
+import json
+import os
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stegovert.json")
+
+DEFAULT_CONFIG = {
+    "transport": {
+        "chunk_size": 64 * 1024,            # Initial read/send/receive chunk in bytes
+        "max_chunk_size": 4 * 1024 * 1024,  # Upper bound for the adaptive mode
+        "adaptive_chunk": True,             # Grow the chunk while throughput improves
+        "sndbuf": None,                     # SO_SNDBUF in bytes, None = OS default
+        "rcvbuf": None,                     # SO_RCVBUF in bytes, None = OS default
+        "retries": 3,                       # Reconnect attempts for a dropped transfer
+        "retry_delay": 1.0,                 # Seconds before the first retry, doubled each time
+        "streams": 1,                       # Parallel connections per packet, or "auto" (from RTT)
+        "max_streams": 8,                   # Upper bound for "auto"
+        "parallel_min_size": 8 * 1024 * 1024,  # Packets below this size use one stream in "auto"
+        "delta": True,                      # Send only the LSB delta when the receiver caches the carrier
+        "upload_carriers": True,            # Upload the carrier after a full send so the next one is a delta
+        "fanout_concurrency": 8,            # Receivers served at once by a multi-target send
+        "range_ttl": 3600,                  # Seconds an abandoned multi-stream transfer is kept for resume
+    },
+    "discovery": {
+        "port": 5001,                       # UDP port receivers answer discovery probes on
+        "timeout": 0.5,                     # Seconds a sender collects answers
+        "scan_timeout": 0.3,                # Per-host connect/HELLO timeout of a subnet scan
+        "scan_concurrency": 256,            # Hosts probed at once by a subnet scan
+    },
+    "daemon": {
+        "bind": "0.0.0.0",                  # Address the headless receiver listens on
+        "port": 5001,
+        "spool_dir": None,                  # Where packets are saved, None = received/ next to the app
+        "prefix": "received_",
+        "concurrency": 64,                  # Transfers handled at once
+        "announce": True,                   # Answer LAN discovery probes
+        "drain_timeout": 30,                # Seconds in-flight transfers get after SIGINT/SIGTERM
+        "log_file": None,                   # Also log to this rotating file
+    },
+    "spool": {
+        "auto_reveal": True,                # Reveal every received packet in the background
+        "workers": None,                    # Reveal processes, None = CPU count
+        "passwords": [],                    # Tried in order on encrypted payloads
+    },
+    "metrics": {
+        "port": None,                       # Serve /metrics (Prometheus) and /metrics.json here, None = off
+        "bind": "127.0.0.1",                # Local only by default
+    },
+    "trace": {
+        "file": None,                       # Append one JSON line per encode/send/receive/reveal, None = off
+    },
+    "profile": {
+        "enabled": False,                   # cProfile every encode/reveal/send/receive (or STEGOVERT_PROFILE=1)
+        "dir": None,                        # Where .prof files go, None = profiles/ next to the app
+        "top": 10,                          # Hot functions listed in the log per profile
+    },
+    "store": {
+        "enabled": True,                    # File packets under their SHA-256 and catalog them in SQLite
+    },
+    "engine": {
+        "name": "numpy",                    # "numpy" (vectorized, same output as stegano) or "stegano"
+        "workers": 1,                       # Processes per embed/reveal, "auto" = one per CPU core
+        "parallel_min_pixels": 4_000_000,   # Use the workers only when the message covers this many pixels
+    },
+    "carriers": {
+        "dir": None,                        # Carrier library folder for auto-fit, None = ask on first use
+        "index": None,                      # Index file, None = .stegovert-carriers.sqlite3 in that folder
+    },
+    "groups": {},                           # Name -> list of "host" / "host:port" receivers
+    "ui": {
+        "progress_rate": 20,                # Max progress redraws per second (Hz)
+        "log_lines": 1000,                  # Lines kept per log panel
+        "meter_delay": 250,                 # Typing pause (ms) before the char count and capacity meter update
+        "log_file": None,                   # Mirror both logs to this rotating file, None = off
+        "log_file_max_bytes": 1024 * 1024,  # Rotate the log file at this size
+        "log_file_backups": 3,              # Rotated files kept
+        "animation_fps": 20,                # Frame rate of UI animations (only while one is running)
+        "debug_animations": False,          # Log per-frame animation cost to the sender log
+    },
+}
+
+
+def _merge(base, override):
+    """Recursively merge override into a copy of base"""
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def load_config(path=None):
+    """Load the JSON config file merged over DEFAULT_CONFIG (missing file = defaults)"""
+    path = path or os.environ.get("STEGOVERT_CONFIG") or CONFIG_PATH
+    if not os.path.exists(path):
+        return copy.deepcopy(DEFAULT_CONFIG)
+    with open(path, "r", encoding="utf-8") as f:
+        return _merge(DEFAULT_CONFIG, json.load(f))
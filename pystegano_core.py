@@ -0,0 +1,114 @@
+"""
+STEGOVERT - Core
+Enkripsi pesan dan pembacaan paket yang dipakai bersama oleh GUI, CLI, daemon dan worker spool.
+"""
+
+import base64
+import hashlib
+import re
+
+import pystegano_engine as engine
+import pystegano_metrics as metrics
+
+# Characters stegano stores wider than 8 bits; reveal reads 8 bits per character, so they come back garbled
+_WIDE_CHARS = re.compile("[^\x00-\xff]")
+
+
+def encrypt_message(message, password):
+    """Simple XOR encryption with password"""
+    if not password:
+        return message
+    with metrics.timed("encrypt"):
+        # Create key from password using SHA256
+        key = hashlib.sha256(password.encode()).digest()
+        # XOR encrypt
+        encrypted = []
+        for i, char in enumerate(message.encode('utf-8')):
+            encrypted.append(char ^ key[i % len(key)])
+        # Base64 encode for safe storage
+        return "ENC:" + base64.b64encode(bytes(encrypted)).decode('utf-8')
+
+
+def _xor_decrypt(encrypted_msg, password):
+    """Decrypt an "ENC:" payload, raising if the result is not valid text"""
+    # Remove prefix and decode base64
+    encoded = encrypted_msg[4:]
+    encrypted_bytes = base64.b64decode(encoded)
+    # Create key from password
+    key = hashlib.sha256(password.encode()).digest()
+    # XOR decrypt
+    decrypted = []
+    for i, byte in enumerate(encrypted_bytes):
+        decrypted.append(byte ^ key[i % len(key)])
+    return bytes(decrypted).decode('utf-8')
+
+
+def decrypt_message(encrypted_msg, password):
+    """Decrypt message using XOR cipher with password-derived key"""
+    if not encrypted_msg.startswith("ENC:"):
+        return encrypted_msg  # Not encrypted
+    if not password:
+        return "[ENCRYPTED - PASSWORD REQUIRED]"
+    try:
+        with metrics.timed("decrypt"):
+            return _xor_decrypt(encrypted_msg, password)
+    except Exception:
+        return "[DECRYPTION FAILED - WRONG PASSWORD?]"
+
+
+def _payload_bits(chars, extra=0):
+    """Bits of a "<length>:" + chars-character payload, padded to whole pixels"""
+    bits = 8 * (chars + len(str(chars)) + 1) + extra
+    return bits + (-bits) % 3
+
+
+def embedded_bits(message, password=None):
+    """Exact number of carrier bits lsb.hide writes for message.
+
+    That is the "<length>:" header plus 8 bits per character (more for characters above
+    U+00FF), padded to whole pixels. With a password the payload is the "ENC:" base64
+    text, whose length depends only on the UTF-8 size of message, so nothing is
+    encrypted here and multi-megabyte messages are sized in a few milliseconds.
+    """
+    if password:
+        return _payload_bits(4 + 4 * -(-len(message.encode("utf-8")) // 3))
+    return _payload_bits(len(message), sum(ord(char).bit_length() - 8 for char in _WIDE_CHARS.findall(message)))
+
+
+def estimated_bits(chars, password=None):
+    """embedded_bits() from the message length alone, without the text: exact for
+    Latin-1 text (ASCII with a password), a lower bound for anything wider"""
+    return _payload_bits(4 + 4 * -(-chars // 3) if password else chars)
+
+
+def capacity_bits(width, height):
+    """Carrier bits available to lsb.hide: one per R, G and B channel of every pixel"""
+    return width * height * 3
+
+
+def unsafe_chars(message, password=None):
+    """Characters of message that would not survive reveal (none once encrypted)"""
+    return 0 if password else len(_WIDE_CHARS.findall(message))
+
+
+def reveal_payload(image_path, passwords=(), timings=None):
+    """Reveal a packet, trying each password on an encrypted payload.
+
+    Returns a dict with the raw "payload", whether it is "encrypted"/"decrypted",
+    and the readable "message" (None while it stays encrypted).
+    timings (a dict) receives the "reveal" and "decrypt" durations.
+    """
+    with metrics.timed("reveal", timings):
+        payload = engine.extract(image_path)
+    result = {"payload": payload, "encrypted": False, "decrypted": False, "message": payload}
+    if payload and payload.startswith("ENC:"):
+        result.update(encrypted=True, message=None)
+        if passwords:
+            with metrics.timed("decrypt", timings):
+                for password in passwords:
+                    try:
+                        result.update(decrypted=True, message=_xor_decrypt(payload, password))
+                        break
+                    except Exception:
+                        continue  # Wrong password (XOR output is not UTF-8)
+    return result
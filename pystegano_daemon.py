@@ -0,0 +1,162 @@
+"""
+STEGOVERT - Receiver Daemon
+Receiver tanpa GUI yang berjalan terus, untuk server tanpa X. Berhenti dengan rapi saat menerima SIGINT/SIGTERM.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+
+import pystegano_engine as engine
+import pystegano_metrics as metrics
+import pystegano_profile as profile
+import pystegano_trace as trace
+from pystegano_config import load_config
+from pystegano_discovery import announce, configure as configure_discovery, local_addresses
+from pystegano_logs import attach_log_file
+from pystegano_spool import Spool, configure as configure_spool
+from pystegano_store import PacketStore
+from pystegano_transport import RECEIVED_DIR, configure as configure_transport, serve
+
+log = logging.getLogger("stegovert.daemon")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="STEGOVERT headless receiver daemon")
+    parser.add_argument("--config", help="File konfigurasi JSON (default: stegovert.json / STEGOVERT_CONFIG)")
+    parser.add_argument("--bind", help="Alamat yang didengarkan (default: 0.0.0.0)")
+    parser.add_argument("--port", type=int, help="Port TCP receiver (default: 5001)")
+    parser.add_argument("--spool", help="Folder penyimpanan paket yang diterima")
+    parser.add_argument("--concurrency", type=int, help="Jumlah transfer yang diproses bersamaan")
+    parser.add_argument("--no-announce", action="store_true", help="Jangan jawab pencarian receiver di LAN")
+    parser.add_argument("--no-reveal", action="store_true", help="Jangan baca paket otomatis di latar belakang")
+    parser.add_argument("--log-file", help="Tulis log juga ke file ini (dirotasi otomatis)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profil CPU receiver sampai berhenti (file .prof di folder profiles/)")
+    parser.add_argument("--trace-file", help="Tulis catatan JSONL per transfer dan reveal ke file ini")
+    parser.add_argument("--metrics-port", type=int, help="Sajikan metrik Prometheus di port ini")
+    return parser.parse_args(argv)
+
+
+def daemon_settings(args):
+    """Merge the "daemon" config section with command-line overrides"""
+    config = load_config(args.config)
+    settings = dict(config["daemon"])
+    overrides = {"bind": args.bind, "port": args.port, "spool_dir": args.spool,
+                 "concurrency": args.concurrency, "log_file": args.log_file}
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+    if args.no_announce:
+        settings["announce"] = False
+    settings["auto_reveal"] = config["spool"]["auto_reveal"] and not args.no_reveal
+    settings["store"] = config["store"]["enabled"]
+    settings["metrics_port"] = config["metrics"]["port"] if args.metrics_port is None else args.metrics_port
+    settings["spool_dir"] = settings["spool_dir"] or RECEIVED_DIR
+    return config, settings
+
+
+def _log_reveal(path, future):
+    name = os.path.basename(path)
+    if future.cancelled():
+        return
+    if future.exception():
+        log.warning("%s: reveal worker failed: %s", name, future.exception())
+        return
+    result = future.result()
+    if result["error"]:
+        log.info("%s: no message (%s)", name, result["error"])
+    elif result["encrypted"] and not result["decrypted"]:
+        log.info("%s: encrypted, no configured password matched", name)
+    else:
+        log.info("%s: revealed in %.3fs", name, result["reveal_seconds"])
+
+
+def _announce_done(task):
+    if not task.cancelled() and task.exception():
+        log.warning("LAN discovery unavailable: %s", task.exception())
+
+
+async def run(settings):
+    """Serve until SIGINT/SIGTERM, then drain in-flight transfers"""
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except (NotImplementedError, AttributeError):
+            # Windows event loops have no signal handlers
+            signal.signal(signum, lambda *_: loop.call_soon_threadsafe(stop.set))
+
+    responder = None
+    if settings["announce"]:
+        responder = asyncio.ensure_future(announce(settings["port"]))
+        responder.add_done_callback(_announce_done)
+
+    store = PacketStore(settings["spool_dir"]) if settings["store"] else None
+    spool = None
+    if settings["auto_reveal"]:
+        spool = Spool(settings["spool_dir"], catalog=store.catalog if store else None)
+        for path, digest in spool.pending():
+            spool.submit(path, sha256=digest).add_done_callback(lambda f, p=path: _log_reveal(p, f))
+
+    def received(peer, path, size, digest):
+        log.info("%s: saved %s (%d bytes, sha256 %s)", peer, path, size, digest[:16])
+        if spool:
+            spool.submit(path, peer=peer, sha256=digest).add_done_callback(lambda f: _log_reveal(path, f))
+
+    log.info("Listening on %s:%d (%s), spool %s, concurrency %d", settings["bind"], settings["port"],
+             ", ".join(local_addresses()) or "no network", settings["spool_dir"], settings["concurrency"])
+    try:
+        await serve(
+            settings["bind"], settings["port"], settings["spool_dir"], settings["prefix"],
+            on_connect=lambda peer: log.debug("Connection from %s", peer),
+            on_header=lambda peer, name, size, offset: log.info(
+                "%s: %s %s (%d bytes)", peer, "resuming" if offset else "receiving", name, size),
+            on_received=received,
+            on_error=lambda peer, exc: log.warning("%s: %s", peer, exc),
+            max_connections=settings["concurrency"],
+            stop=stop,
+            drain_timeout=settings["drain_timeout"],
+            store=store,
+        )
+    finally:
+        if responder:
+            responder.cancel()
+        if spool:
+            await spool.drain()  # Let queued reveals finish writing their results
+            spool.pool.shutdown()
+        if store:
+            store.close()
+    log.info("Stopped")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    config, settings = daemon_settings(args)
+    configure_transport(config["transport"])
+    configure_discovery(config["discovery"])
+    configure_spool(config["spool"])
+    engine.configure(config["engine"])
+    metrics.configure(config["metrics"])
+    trace.configure(config["trace"])
+    profile.configure(config["profile"])
+    if args.profile:
+        profile.configure({"enabled": True})
+    if args.trace_file:
+        trace.configure({"file": args.trace_file})
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", stream=sys.stdout)
+    if settings["log_file"]:
+        attach_log_file(settings["log_file"])
+    try:
+        if metrics.start_http_server(settings["metrics_port"]):
+            log.info("Metrics on http://%s:%d/metrics", metrics.SETTINGS["bind"], settings["metrics_port"])
+        asyncio.run(profile.wrap("daemon", run)(settings))
+    except OSError as e:
+        log.error("Cannot start receiver: %s", e)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+STEGOVERT - Carrier Delta
+Mengirim hanya bit LSB yang berubah jika receiver sudah menyimpan gambar carrier yang sama.
+"""
+
+import hashlib
+import json
+import os
+import struct
+
+import numpy as np
+from PIL import Image
+
+DELTA_MAGIC = b"SVDELTA1"
+
+
+def open_carrier(image_path):
+    """Open an image the way stegano's Hider does (RGB/RGBA kept, other modes -> RGB)"""
+    img = Image.open(image_path)
+    if img.mode not in ("RGB", "RGBA"):
+        with img:
+            return img.convert("RGB")
+    return img  # Closed by the caller's with block
+
+
+def pixel_hash(img):
+    """SHA-256 over mode, size and decoded pixels, independent of the file encoding"""
+    digest = hashlib.sha256(f"{img.mode}:{img.width}x{img.height}:".encode())
+    digest.update(img.tobytes())
+    return digest.hexdigest()
+
+
+def carrier_hash(image_path):
+    """Content hash both sides use to agree on a carrier"""
+    with open_carrier(image_path) as img:
+        return pixel_hash(img)
+
+
+def is_digest(value):
+    """True for a pixel_hash() hex digest, the only carrier name carrier_path() may be given"""
+    return isinstance(value, str) and len(value) == 64 and all(c in "0123456789abcdef" for c in value)
+
+
+def carrier_path(carrier_dir, digest):
+    """Location of a cached carrier"""
+    return os.path.join(carrier_dir, f"{digest}.png")
+
+
+def export_carrier(image_path, output_path):
+    """Save the decoded carrier losslessly so the receiver hashes the same pixels"""
+    with open_carrier(image_path) as img:
+        img.save(output_path, "PNG")
+    return output_path
+
+
+def store_carrier(image_path, carrier_dir):
+    """Add an uploaded carrier to the cache under its content hash. Returns the hash"""
+    os.makedirs(carrier_dir, exist_ok=True)
+    with open_carrier(image_path) as img:
+        digest = pixel_hash(img)
+        target = carrier_path(carrier_dir, digest)
+        if not os.path.exists(target):
+            img.save(target + ".tmp", "PNG")
+            os.replace(target + ".tmp", target)
+    return digest
+
+
+def _rgb_index(count, channels):
+    """Flat array positions of the first count R,G,B values (alpha is never embedded)"""
+    k = np.arange(count, dtype=np.int64)
+    return (k // 3) * channels + k % 3
+
+
+def make_delta(carrier_image_path, packet_path, output_path):
+    """Write the LSB plane that turns the carrier into the packet.
+
+    Returns output_path, or None when the packet is not the carrier plus LSB changes
+    (different size/mode, or any other bit touched), in which case it must be sent whole.
+    """
+    with open_carrier(carrier_image_path) as carrier_img, Image.open(packet_path) as packet_img:
+        if (carrier_img.mode, carrier_img.size) != (packet_img.mode, packet_img.size):
+            return None
+        carrier = np.asarray(carrier_img)
+        packet = np.asarray(packet_img)
+        digest = pixel_hash(carrier_img)
+        packet_digest = pixel_hash(packet_img)
+
+    if ((carrier ^ packet) & 0xFE).any():
+        return None
+    channels = carrier.shape[2]
+    if channels == 4 and (carrier[..., 3] != packet[..., 3]).any():
+        return None
+
+    # lsb.hide writes pixels in order, so everything after the last change is untouched
+    changed = np.flatnonzero((carrier[..., :3] != packet[..., :3]).reshape(-1))
+    count = int(changed[-1]) + 1 if changed.size else 0
+    bits = packet.reshape(-1)[_rgb_index(count, channels)] & 1
+
+    header = json.dumps({"carrier": digest, "count": count, "packet": packet_digest}).encode()
+    with open(output_path, "wb") as f:
+        f.write(DELTA_MAGIC)
+        f.write(struct.pack(">I", len(header)))
+        f.write(header)
+        f.write(np.packbits(bits).tobytes())
+    return output_path
+
+
+def apply_delta(delta_path, carrier_dir, output_path):
+    """Rebuild the packet PNG from a cached carrier and a delta file"""
+    with open(delta_path, "rb") as f:
+        if f.read(len(DELTA_MAGIC)) != DELTA_MAGIC:
+            raise ValueError("Not a carrier delta")
+        (header_len,) = struct.unpack(">I", f.read(4))
+        header = json.loads(f.read(header_len))
+        packed = np.frombuffer(f.read(), dtype=np.uint8)
+
+    if not is_digest(header.get("carrier")):
+        raise ValueError("Delta names no valid carrier hash")  # Comes from the peer: never a path
+    source = carrier_path(carrier_dir, header["carrier"])
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"Carrier {header['carrier'][:12]} is not cached")
+
+    with open_carrier(source) as carrier_img:
+        mode, size = carrier_img.mode, carrier_img.size
+        pixels = np.array(carrier_img)
+    count = header["count"]
+    flat = pixels.reshape(-1)
+    index = _rgb_index(count, pixels.shape[2])
+    flat[index] = (flat[index] & 0xFE) | np.unpackbits(packed, count=count)
+
+    rebuilt = Image.frombytes(mode, size, pixels.tobytes())
+    if pixel_hash(rebuilt) != header["packet"]:
+        raise ValueError("Rebuilt packet does not match the sender's pixels")
+    rebuilt.save(output_path, "PNG")
+    return output_path
@@ -0,0 +1,258 @@
+"""
+STEGOVERT - Discovery
+Daftar alamat IP lokal (di-cache) dan pencarian receiver di LAN lewat broadcast UDP.
+"""
+
+import asyncio
+import ipaddress
+import socket
+import struct
+import sys
+import time
+
+from pystegano_config import DEFAULT_CONFIG
+from pystegano_transport import DEFAULT_PORT, SEPARATOR, hello
+
+# ===================== KONFIGURASI =====================
+ADDRESS_TTL = 60  # Seconds before the address list is rescanned even without interface changes
+PROBE = f"STEGOVERT{SEPARATOR}DISCOVER\n".encode()
+
+# Tunables from the "discovery" section of the config file
+SETTINGS = dict(DEFAULT_CONFIG["discovery"])
+
+
+def configure(options):
+    """Apply discovery settings (see pystegano_config.DEFAULT_CONFIG["discovery"])"""
+    SETTINGS.update(options)
+
+
+# ===================== LOCAL ADDRESSES =====================
+_address_cache = {"fingerprint": None, "time": 0.0, "addresses": [], "broadcasts": []}
+
+
+def _interface_fingerprint():
+    """Cheap snapshot of the interface list, used to notice changes without a rescan"""
+    try:
+        return tuple(socket.if_nameindex())
+    except (AttributeError, OSError):
+        return None  # Not available on this platform: rely on ADDRESS_TTL
+
+
+def _primary_address():
+    """Source address of the default route (UDP connect sends no packet)"""
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        s.connect(("8.8.8.8", 1))
+        return s.getsockname()[0]
+    except OSError:
+        return None  # Offline: no default route
+    finally:
+        s.close()
+
+
+def _linux_interfaces():
+    """(address, broadcast) of every IPv4 interface via SIOCGIFADDR / SIOCGIFBRDADDR"""
+    import fcntl
+    found = []
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        for _, name in socket.if_nameindex():
+            request = struct.pack("256s", name[:15].encode())
+            try:
+                address = socket.inet_ntoa(fcntl.ioctl(s.fileno(), 0x8915, request)[20:24])
+            except OSError:
+                continue  # Interface without an IPv4 address
+            try:
+                broadcast = socket.inet_ntoa(fcntl.ioctl(s.fileno(), 0x8919, request)[20:24])
+            except OSError:
+                broadcast = None
+            found.append((address, broadcast))
+    finally:
+        s.close()
+    return found
+
+
+def _scan():
+    interfaces = []
+    if sys.platform.startswith("linux"):
+        try:
+            interfaces = _linux_interfaces()
+        except (ImportError, OSError):
+            pass
+    try:
+        for info in socket.getaddrinfo(socket.gethostname(), None, socket.AF_INET):
+            interfaces.append((info[4][0], None))
+    except OSError:
+        pass
+
+    primary = _primary_address()
+    addresses, broadcasts = [], []
+    for address, broadcast in ([(primary, None)] if primary else []) + interfaces:
+        if address.startswith("127.") or address in addresses:
+            continue
+        addresses.append(address)
+        # Without an interface broadcast, assume the common /24 LAN
+        broadcast = broadcast or str(ipaddress.ip_network(f"{address}/24", strict=False).broadcast_address)
+        if broadcast not in broadcasts:
+            broadcasts.append(broadcast)
+    return addresses, broadcasts
+
+
+def _refresh(force=False):
+    fingerprint = _interface_fingerprint()
+    expired = time.monotonic() - _address_cache["time"] > ADDRESS_TTL
+    if force or expired or fingerprint != _address_cache["fingerprint"]:
+        addresses, broadcasts = _scan()
+        _address_cache.update(fingerprint=fingerprint, time=time.monotonic(), addresses=addresses,
+                              broadcasts=broadcasts)
+    return _address_cache
+
+
+def local_addresses(refresh=False):
+    """Non-loopback IPv4 addresses of this host, default route first.
+
+    Scanned once and cached; rescanned when the interface list changes or after ADDRESS_TTL.
+    """
+    return list(_refresh(refresh)["addresses"])
+
+
+def get_local_ip():
+    """Mendapatkan IP Address lokal perangkat"""
+    addresses = local_addresses()
+    return addresses[0] if addresses else "127.0.0.1"
+
+
+def local_networks():
+    """The /24 network around each local address, the default scan range"""
+    networks = []
+    for address in local_addresses():
+        network = ipaddress.ip_network(f"{address}/24", strict=False)
+        if network not in networks:
+            networks.append(network)
+    return networks
+
+
+def broadcast_addresses():
+    """Broadcast address of every local network, plus the limited broadcast"""
+    return list(_refresh()["broadcasts"]) + ["255.255.255.255"]
+
+
+# ===================== LAN DISCOVERY =====================
+# Sender  -> broadcast "STEGOVERT<SEPARATOR>DISCOVER\n" to UDP SETTINGS["port"]
+# Receiver -> unicast  "STEGOVERT<SEPARATOR>ANNOUNCE<SEPARATOR>tcp_port<SEPARATOR>name\n"
+def format_announce(port, name):
+    return f"STEGOVERT{SEPARATOR}ANNOUNCE{SEPARATOR}{port}{SEPARATOR}{name}\n".encode()
+
+
+def parse_announce(data):
+    """(tcp_port, name) from an ANNOUNCE datagram, or None for anything else"""
+    try:
+        magic, kind, port, name = data.decode().rstrip("\n").split(SEPARATOR, 3)
+        if magic == "STEGOVERT" and kind == "ANNOUNCE":
+            return int(port), name
+    except (UnicodeDecodeError, ValueError):
+        pass
+    return None
+
+
+class _Responder(asyncio.DatagramProtocol):
+    def __init__(self, reply):
+        self.reply = reply
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if data == PROBE:
+            self.transport.sendto(self.reply, addr)
+
+
+async def announce(port, name=None, discovery_port=None):
+    """Answer discovery probes for a receiver on TCP port until cancelled.
+
+    Raises OSError if the discovery port cannot be bound.
+    """
+    loop = asyncio.get_running_loop()
+    discovery_port = discovery_port or SETTINGS["port"]
+    reply = format_announce(port, name or socket.gethostname())
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: _Responder(reply), local_addr=("0.0.0.0", discovery_port), allow_broadcast=True,
+        reuse_port=hasattr(socket, "SO_REUSEPORT"))
+    try:
+        await loop.create_future()  # Serve until cancelled
+    finally:
+        transport.close()
+
+
+class _Collector(asyncio.DatagramProtocol):
+    def __init__(self, found):
+        self.found = found
+
+    def datagram_received(self, data, addr):
+        reply = parse_announce(data)
+        if reply:
+            self.found[(addr[0], reply[0])] = reply[1]
+
+
+async def discover(timeout=None, discovery_port=None):
+    """Broadcast a probe and collect the receivers answering within timeout seconds.
+
+    Returns a list of (host, port, name), sorted by host.
+    """
+    loop = asyncio.get_running_loop()
+    discovery_port = discovery_port or SETTINGS["port"]
+    found = {}
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: _Collector(found), local_addr=("0.0.0.0", 0), allow_broadcast=True)
+    try:
+        for target in broadcast_addresses():
+            try:
+                transport.sendto(PROBE, (target, discovery_port))
+            except OSError:
+                pass
+        await asyncio.sleep(timeout or SETTINGS["timeout"])
+    finally:
+        transport.close()
+    return sorted(((host, port, name) for (host, port), name in found.items()),
+                  key=lambda item: socket.inet_aton(item[0]))
+
+
+def format_targets(receivers, default_port):
+    """Target field text for discovered receivers ("host" or "host:port", comma separated)"""
+    return ", ".join(host if port == default_port else f"{host}:{port}" for host, port, _ in receivers)
+
+
+# ===================== SUBNET SCAN =====================
+async def scan_subnet(networks=None, port=None, timeout=None, concurrency=None, on_found=None):
+    """Probe every host of one or more CIDR ranges (default: local_networks()) for receivers.
+
+    Connects run concurrently with a short timeout and each open port must answer the
+    HELLO handshake, so other services on the port are not counted. on_found(host, version)
+    fires as receivers answer. Returns the (host, version) pairs sorted by host.
+    """
+    if networks is None:
+        networks = local_networks()
+    elif isinstance(networks, str):
+        networks = [networks]
+    port = port or DEFAULT_PORT
+    timeout = timeout or SETTINGS["scan_timeout"]
+    semaphore = asyncio.Semaphore(concurrency or SETTINGS["scan_concurrency"])
+    own = set(local_addresses())
+    found = []
+
+    async def probe(host):
+        async with semaphore:
+            try:
+                version = await hello(host, port, timeout)
+            except (OSError, asyncio.TimeoutError):
+                return
+        if version is not None:
+            found.append((host, version))
+            if on_found:
+                on_found(host, version)
+
+    hosts = dict.fromkeys(str(address) for network in networks
+                          for address in ipaddress.ip_network(network, strict=False).hosts())
+    await asyncio.gather(*(probe(host) for host in hosts if host not in own))
+    return sorted(found, key=lambda item: socket.inet_aton(item[0]))
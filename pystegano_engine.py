@@ -0,0 +1,244 @@
+"""
+STEGOVERT - Engine
+Embed/reveal LSB tervektorisasi (numpy) yang identik bit demi bit dengan stegano, opsional paralel multi-proses lewat shared memory.
+"""
+
+import concurrent.futures
+import multiprocessing
+import os
+import threading
+from multiprocessing import shared_memory
+
+from pystegano_config import DEFAULT_CONFIG
+
+# Tunables from the "engine" section of the config file
+SETTINGS = dict(DEFAULT_CONFIG["engine"])
+
+MODES = ("RGB", "RGBA")  # Other modes go to stegano, which converts them itself
+ALIGN = 8  # Region boundaries in pixels: 8 pixels = 24 bits = 3 whole payload bytes
+HEADER_CHARS = 21  # Longest "<length>:" header read before the message length is known
+
+_pool = {"executor": None, "workers": 0}
+_pool_lock = threading.Lock()
+
+
+def configure(options):
+    """Apply engine settings (see pystegano_config.DEFAULT_CONFIG["engine"])"""
+    SETTINGS.update(options)
+
+
+# ===================== ENTRY POINTS =====================
+def embed(image, message):
+    """Hide message in image (a path or PIL image) with the configured engine; returns the new image"""
+    if SETTINGS["name"] == "stegano":
+        from stegano import lsb
+        return lsb.hide(image, message)
+    return hide(image, message)
+
+
+def extract(image):
+    """Reveal the message of image (a path or PIL image) with the configured engine"""
+    if SETTINGS["name"] == "stegano":
+        from stegano import lsb
+        return lsb.reveal(image)
+    return reveal(image)
+
+
+# ===================== NUMPY ENGINE =====================
+# stegano's layout: "<length>:" + message, 8 bits per character (MSB first, wider above
+# U+00FF), padded with zero bits to a multiple of 3 and written to the R, G and B LSBs
+# of pixels in row order. Pixels past the message and the alpha channel are untouched.
+def _payload(message):
+    """(packed payload bytes, pixel count) for message, exactly as stegano lays it out"""
+    import numpy as np
+    text = f"{len(message)}:{message}"
+    try:
+        packed = np.frombuffer(text.encode("latin-1"), np.uint8)
+        nbits = 8 * len(text)
+    except UnicodeEncodeError:
+        bits = "".join(bin(ord(char))[2:].rjust(8, "0") for char in text)
+        packed = np.packbits(np.frombuffer(bits.encode(), np.uint8) - ord("0"))
+        nbits = len(bits)
+    count = -(-nbits // 3)
+    needed = -(-3 * count // 8)
+    if packed.size < needed:
+        packed = np.concatenate([packed, np.zeros(needed - packed.size, np.uint8)])  # The padding bits
+    return packed, count
+
+
+def _embed_region(pixels, payload, start, stop):
+    """Write payload bits 3*start.. into the LSBs of pixel rows [start, stop) (start aligned)"""
+    import numpy as np
+    first = 3 * start // 8
+    bits = np.unpackbits(payload[first:-(-3 * stop // 8)], count=3 * (stop - start))
+    region = pixels[start:stop, :3]
+    region &= 0xFE
+    region |= bits.reshape(-1, 3)
+
+
+def _extract_region(pixels, out, start, stop):
+    """Pack the LSBs of pixel rows [start, stop) into out from byte 3*start/8 (start aligned)"""
+    import numpy as np
+    packed = np.packbits(pixels[start:stop, :3] & 1)
+    first = 3 * start // 8
+    out[first:first + packed.size] = packed
+
+
+def _pixels(image, count):
+    """Read-only (pixels, channels) view of the decoded rows holding the first count pixels"""
+    import numpy as np
+    rows = -(-count // image.width)
+    if rows < image.height:
+        image = image.crop((0, 0, image.width, rows))  # Only decode the rows the message touches
+    return np.asarray(image).reshape(-1, len(image.getbands()))
+
+
+def hide(image, message, workers=None):
+    """Drop-in for stegano's lsb.hide(image, message): identical output pixels, same errors.
+
+    workers > 1 (default SETTINGS["workers"]) splits the touched pixels into regions
+    embedded by worker processes in shared memory, once at least
+    SETTINGS["parallel_min_pixels"] pixels carry the message.
+    """
+    import numpy as np
+    from PIL import Image
+
+    if not message:
+        raise AssertionError("message length is zero")  # stegano's assert, kept under python -O
+    if isinstance(image, (str, os.PathLike)):
+        with Image.open(image) as img:
+            return hide(img, message, workers)
+    if image.mode not in MODES:
+        from stegano import lsb
+        return lsb.hide(image, message)
+    payload, count = _payload(message)
+    if count > image.width * image.height:
+        raise Exception(f"The message you want to hide is too long: {len(message)}")
+
+    workers = _workers(workers, count)
+    if workers == 1:
+        pixels = np.array(image).reshape(-1, len(image.getbands()))
+        _embed_region(pixels, payload, 0, count)
+        result = Image.fromarray(pixels.reshape(image.height, image.width, -1))
+    else:
+        # The touched rows go straight from the decoded image into shared memory, and the
+        # embedded rows straight from there into the new image: nothing is copied back
+        touched = _in_shared_memory(_embed_worker, workers, _pixels(image, count), count, payload,
+                                    lambda pixels, _: Image.frombytes(
+                                        image.mode, (image.width, len(pixels) // image.width), pixels))
+        if touched.height == image.height:
+            result = touched
+        else:
+            result = image.copy()
+            result.paste(touched, (0, 0))
+    result.info = dict(image.info)  # As Image.copy() in stegano
+    return result
+
+
+def reveal(image, workers=None):
+    """Drop-in for stegano's lsb.reveal(image); same message, same errors for no message"""
+    import numpy as np
+    from PIL import Image
+
+    if isinstance(image, (str, os.PathLike)):
+        with Image.open(image) as img:
+            return reveal(img, workers)
+    if image.mode not in MODES:
+        from stegano import lsb
+        return lsb.reveal(image)
+    total = image.width * image.height
+
+    # "<length>:" first, from the few pixels that can hold it
+    head_count = min(total, -(-HEADER_CHARS * 8 // 3))
+    head = np.zeros(-(-3 * head_count // 8), np.uint8)
+    _extract_region(_pixels(image, head_count), head, 0, head_count)
+    header = head[:3 * head_count // 8].tobytes().decode("latin-1")
+    length, colon, _ = header.partition(":")
+    if not colon or not length.isdigit():
+        raise IndexError("Impossible to detect message.")
+    offset, limit = len(length) + 1, int(length)
+    count = -(-8 * (offset + limit) // 3)
+    if count > total:
+        raise IndexError("Impossible to detect message.")  # The length points past the last pixel
+
+    pixels = _pixels(image, count)
+    out = np.zeros(-(-3 * count // 8), np.uint8)
+    workers = _workers(workers, count)
+    if workers == 1:
+        _extract_region(pixels, out, 0, count)
+    else:
+        out = _in_shared_memory(_extract_worker, workers, pixels, count, out, lambda _, payload: payload.copy())
+    return out[offset:offset + limit].tobytes().decode("latin-1")
+
+
+# ===================== MULTI-PROCESS =====================
+def _workers(workers, count):
+    """Worker processes for a message of count pixels (1 = in this process)"""
+    workers = SETTINGS["workers"] if workers is None else workers
+    if workers in (None, 0, "auto"):
+        workers = os.cpu_count() or 1
+    if workers <= 1 or count < SETTINGS["parallel_min_pixels"] or multiprocessing.parent_process() is not None:
+        return 1  # Small job, or already inside a worker process (spool): no nested pools
+    return min(workers, -(-count // ALIGN))
+
+
+def _executor(workers):
+    """Process pool shared by every call, rebuilt if the worker count changes"""
+    with _pool_lock:
+        if _pool["workers"] != workers:
+            if _pool["executor"]:
+                _pool["executor"].shutdown(wait=False)
+            _pool.update(executor=concurrent.futures.ProcessPoolExecutor(workers), workers=workers)
+        return _pool["executor"]
+
+
+def _regions(count, workers):
+    """[start, stop) pixel ranges, one per worker, starting on ALIGN boundaries"""
+    size = -(-count // workers)
+    size += -size % ALIGN
+    return [(start, min(start + size, count)) for start in range(0, count, size)]
+
+
+def _in_shared_memory(worker, workers, pixels, count, payload, finish):
+    """Run worker over the regions of the first count of pixels (whole rows) and payload,
+    both put in shared memory so each process only receives names and offsets. Returns
+    finish(pixels, payload) of the shared arrays, which must copy what it keeps."""
+    import numpy as np
+    blocks = [shared_memory.SharedMemory(create=True, size=max(1, array.nbytes)) for array in (pixels, payload)]
+    views = []
+    try:
+        views = [np.ndarray(array.shape, np.uint8, block.buf) for array, block in zip((pixels, payload), blocks)]
+        views[0][:] = pixels
+        views[1][:] = payload
+        futures = [_executor(workers).submit(worker, blocks[0].name, views[0].shape, blocks[1].name,
+                                             payload.size, start, stop)
+                   for start, stop in _regions(count, workers)]
+        for future in futures:
+            future.result()
+        return finish(*views)
+    finally:
+        views.clear()  # Buffers must be released before the blocks close
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def _embed_worker(pixels_name, shape, payload_name, payload_size, start, stop):
+    _run_worker(_embed_region, pixels_name, shape, payload_name, payload_size, start, stop)
+
+
+def _extract_worker(pixels_name, shape, out_name, out_size, start, stop):
+    _run_worker(_extract_region, pixels_name, shape, out_name, out_size, start, stop)
+
+
+def _run_worker(region, pixels_name, shape, payload_name, payload_size, start, stop):
+    import numpy as np
+    # Pool workers share the parent's resource tracker, so attaching does not take ownership
+    pixels_block = shared_memory.SharedMemory(name=pixels_name)
+    payload_block = shared_memory.SharedMemory(name=payload_name)
+    try:
+        region(np.ndarray(shape, np.uint8, pixels_block.buf),
+               np.ndarray((payload_size,), np.uint8, payload_block.buf), start, stop)
+    finally:
+        pixels_block.close()
+        payload_block.close()
@@ -3,17 +3,19 @@ STEGOVERT - Advanced Steganography Gaming-Style Application
 Aplikasi untuk menyembunyikan pesan rahasia dalam gambar dan mengirimnya melalui jaringan.
 """
 
+import time
+STARTED = time.perf_counter()  # Start-up report baseline, taken before the heavy imports
+
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 from PIL import Image, ImageTk
+import asyncio
+import importlib.util
 import socket
 import os
 import sys
 import threading
-import time
 import math
-import base64
-import hashlib
 try:
     import winsound
     HAS_WINSOUND = True
@@ -21,12 +23,8 @@ except ImportError:
     HAS_WINSOUND = False
 import io
 
-# Optional imports
-try:
-    import qrcode
-    HAS_QRCODE = True
-except ImportError:
-    HAS_QRCODE = False
+# Optional imports (qrcode is loaded when a QR code is first shown)
+HAS_QRCODE = importlib.util.find_spec("qrcode") is not None
 
 try:
     from tkinterdnd2 import DND_FILES, TkinterDnD
@@ -34,18 +32,31 @@ try:
 except ImportError:
     HAS_DND = False
 
-# Import stegano library
-try:
-    from stegano import lsb
-except ImportError:
+# stegano (with OpenCV and numpy) is imported on the first encode/reveal
+if importlib.util.find_spec("stegano") is None:
     print("Error: Library 'stegano' belum diinstall.")
     print("Ketik: pip install stegano")
     sys.exit()
 
+import pystegano_animation as animation
+import pystegano_engine as engine
+import pystegano_metrics as metrics
+import pystegano_profile as profile
+import pystegano_trace as trace
+from pystegano_carriers import CarrierLibrary
+from pystegano_config import load_config
+from pystegano_core import (capacity_bits, decrypt_message, embedded_bits, encrypt_message, estimated_bits,
+                            unsafe_chars)
+from pystegano_discovery import (announce, configure as configure_discovery, discover, format_targets,
+                                 get_local_ip, local_addresses, scan_subnet)
+from pystegano_logs import LogPipeline, attach_log_file
+from pystegano_progress import ProgressBus
+from pystegano_spool import Spool, configure as configure_spool, load_result
+from pystegano_store import PacketStore
+from pystegano_transport import (DEFAULT_PORT, RECEIVED_DIR, TransportLoop, configure as configure_transport, file_sha256,
+                                 parse_target, resolve_targets, send_packet, send_to_many, serve)
+
 # ===================== KONFIGURASI =====================
-SEPARATOR = "<SEPARATOR>"
-BUFFER_SIZE = 4096
-DEFAULT_PORT = 5001
 APP_VERSION = "3.0.0"
 ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
 
@@ -72,54 +83,6 @@ COLORS_DARK = COLORS
 COLORS_LIGHT = COLORS
 
 # ===================== UTILITY FUNCTIONS =====================
-def get_local_ip():
-    """Mendapatkan IP Address lokal perangkat"""
-    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    try:
-        s.connect(('8.8.8.8', 1))
-        IP = s.getsockname()[0]
-    except Exception:
-        IP = '127.0.0.1'
-    finally:
-        s.close()
-    return IP
-
-
-def encrypt_message(message, password):
-    """Encrypt message using XOR cipher with password-derived key"""
-    if not password:
-        return message
-    # Create key from password using SHA256
-    key = hashlib.sha256(password.encode()).digest()
-    # XOR encrypt
-    encrypted = []
-    for i, char in enumerate(message.encode('utf-8')):
-        encrypted.append(char ^ key[i % len(key)])
-    # Base64 encode for safe storage
-    return "ENC:" + base64.b64encode(bytes(encrypted)).decode('utf-8')
-
-
-def decrypt_message(encrypted_msg, password):
-    """Decrypt message using XOR cipher with password-derived key"""
-    if not encrypted_msg.startswith("ENC:"):
-        return encrypted_msg  # Not encrypted
-    if not password:
-        return "[ENCRYPTED - PASSWORD REQUIRED]"
-    try:
-        # Remove prefix and decode base64
-        encoded = encrypted_msg[4:]
-        encrypted_bytes = base64.b64decode(encoded)
-        # Create key from password
-        key = hashlib.sha256(password.encode()).digest()
-        # XOR decrypt
-        decrypted = []
-        for i, byte in enumerate(encrypted_bytes):
-            decrypted.append(byte ^ key[i % len(key)])
-        return bytes(decrypted).decode('utf-8')
-    except Exception:
-        return "[DECRYPTION FAILED - WRONG PASSWORD?]"
-
-
 def play_sound(sound_type):
     """Play system sound effects"""
     if not HAS_WINSOUND:
@@ -137,12 +100,17 @@ def play_sound(sound_type):
         pass  # Sound not available
 
 
-def ping_host(ip, port, timeout=3):
-    """Test connection to host"""
+def ping_host(ip, port, timeout=3, hello=False):
+    """Test connection to host (with hello=True, only a STEGOVERT receiver counts)"""
     try:
         s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         s.settimeout(timeout)
         s.connect((ip, port))
+        if hello:
+            s.sendall(b"HELLO\n")
+            reply = s.recv(64)
+            s.close()
+            return reply.startswith(b"STEGOVERT")
         s.close()
         return True
     except Exception:
@@ -154,6 +122,7 @@ def generate_qr_code(data):
     if not HAS_QRCODE:
         return None
     try:
+        import qrcode
         qr = qrcode.QRCode(
             version=1,
             error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -170,15 +139,12 @@ def generate_qr_code(data):
 
 
 def estimate_capacity(image_path):
-    """Estimate how many characters can be hidden in an image"""
+    """Exact carrier bits of an image (only the header is read), with its size"""
     try:
-        img = Image.open(image_path)
-        width, height = img.size
-        # LSB uses 3 bits per pixel (RGB), 8 bits per character
-        total_pixels = width * height
-        # Conservative estimate: use only 10% of capacity for safety
-        max_chars = (total_pixels * 3) // 8 // 10
-        return max_chars, width, height
+        with metrics.timed("estimate_capacity"):
+            with Image.open(image_path) as img:
+                width, height = img.size
+        return capacity_bits(width, height), width, height
     except Exception:
         return 0, 0, 0
 
@@ -212,6 +178,8 @@ class GlowButton(ctk.CTkButton):
 # ===================== MAIN APPLICATION =====================
 class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
     def __init__(self):
+        self.startup = profile.StartupTimer(STARTED)
+        self.startup.mark("imports")
         super().__init__()
         if HAS_DND:
             self.TkdndVersion = TkinterDnD._require(self)
@@ -222,32 +190,49 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
         self.minsize(900, 650)
         self.configure(fg_color=COLORS["bg_dark"])
         
-        # Load assets
+        # Load assets (logo decoded once, shared by the icon and the header)
         self.logo_image = None
         try:
             logo_path = os.path.join(ASSETS_DIR, "logo.png")
             if os.path.exists(logo_path):
+                with Image.open(logo_path) as logo:
+                    logo.load()
+                    logo = logo.copy()
                 # Set window icon
-                icon_img = Image.open(logo_path)
-                self.iconphoto(False, ImageTk.PhotoImage(icon_img))
+                self.iconphoto(False, ImageTk.PhotoImage(logo))
                 
                 # Prepare for header
-                self.logo_image = ctk.CTkImage(
-                    light_image=Image.open(logo_path),
-                    dark_image=Image.open(logo_path),
-                    size=(50, 50)
-                )
+                self.logo_image = ctk.CTkImage(light_image=logo, dark_image=logo, size=(50, 50))
         except Exception as e:
             print(f"Error loading assets: {e}")
         
         # Variables
         self.selected_image_path = None
+        self.carrier_info = None  # (capacity bits, width, height, file size) of the selected image
+        self.char_count_job = None
+        self.meter_generation = 0
         self.encoded_image_path = None
+        self.encoded_carrier_path = None
         self.received_image_path = None
-        self.server_socket = None
+        self.server_task = None
         self.server_running = False
+        self.config = load_config()
+        configure_transport(self.config["transport"])
+        configure_discovery(self.config["discovery"])
+        configure_spool(self.config["spool"])
+        engine.configure(self.config["engine"])
+        self.announce_task = None
+        self.spool = None
+        self.store = None
+        self.carriers = None
+        self.transport = TransportLoop()
+        self.progress = ProgressBus(self, self.config["ui"]["progress_rate"])
+        self.progress.subscribe("send", self._show_send_progress)
+        self.progress.subscribe("receive", self._show_receive_progress)
+        self.progress.subscribe("status", self._show_status)
         self.current_theme = "dark"
-        self.animation_running = True
+        self.active_sends = 0
+        self.receive_activity = 0.0  # monotonic time of the last received header/chunk
         
         # Set default theme
         ctk.set_appearance_mode("dark")
@@ -258,21 +243,82 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
         self._create_main_content()
         self._create_status_bar()
         
-        # Start animation loop
-        self._start_animations()
+        # Worker threads log through queues flushed by the UI thread
+        ui = self.config["ui"]
+        if ui["log_file"]:
+            attach_log_file(ui["log_file"], ui["log_file_max_bytes"], ui["log_file_backups"])
+        self.sender_logs = LogPipeline(self.sender_log, "sender", self.progress, ui["log_lines"])
+        # The receiver tab is built after first paint; its log queues until then
+        self.receiver_logs = LogPipeline(None, "receiver", self.progress, ui["log_lines"])
+        
+        # Diagnostics: Prometheus endpoint (metrics.port), trace file and profiler
+        metrics.configure(self.config["metrics"])
+        trace.configure(self.config["trace"])
+        profile.configure(self.config["profile"])
+        try:
+            self.metrics_server = metrics.start_http_server()
+            if self.metrics_server:
+                self._log_sender(f"[+] Metrics on http://{metrics.SETTINGS['bind']}:{metrics.SETTINGS['port']}/metrics")
+        except OSError as e:
+            self.metrics_server = None
+            self._log_sender(f"[!] Metrics endpoint unavailable: {e}")
+        
+        # Animations: one scheduler, asleep unless an effect is running
+        self.animations = animation.AnimationScheduler(
+            self, ui["animation_fps"], debug=ui["debug_animations"], report=self._log_sender)
         
         # Handle window close
         self.protocol("WM_DELETE_WINDOW", self._on_closing)
+        
+        # Hidden tabs are built once the window is on screen
+        self.startup.mark("window")
+        self.after_idle(self._on_first_paint)
+    
+    # ==================== STARTUP ====================
+    def _on_first_paint(self):
+        """Window shown: build the hidden tabs one per event-loop turn"""
+        self.startup.mark("first paint")
+        self.after(1, self._build_deferred_tabs, ["receiver", "about"])
+    
+    def _build_deferred_tabs(self, remaining):
+        self._ensure_tab(remaining.pop(0))
+        if remaining:
+            self.after(1, self._build_deferred_tabs, remaining)
+            return
+        self.startup.mark("tabs")
+        self._log_sender(f"[~] Startup: {self.startup.report()}")
+    
+    def _ensure_tab(self, tab_name):
+        """Build a tab on first use (a no-op once built)"""
+        if tab_name in self._built_tabs:
+            return
+        self._built_tabs.add(tab_name)
+        if tab_name == "sender":
+            self._build_sender_tab()
+        elif tab_name == "receiver":
+            self._build_receiver_tab()
+            self.receiver_logs.attach(self.receiver_log)
+        elif tab_name == "about":
+            self._build_about_tab()
     
     # ==================== ANIMATIONS ====================
-    def _start_animations(self):
-        """Start UI animations"""
-        self._pulse_animation()
+    def _animate_transfer(self):
+        """Pulse the status bar while a send is running or data is arriving (UI thread)"""
+        if not self.animations.running("transfer"):
+            self.animations.start("transfer", self._pulse_status, on_stop=self._reset_status_color)
+    
+    def _send_finished(self):
+        self.active_sends -= 1
     
-    def _pulse_animation(self):
-        """Pulse animation for active elements"""
-        if self.animation_running:
-            self.after(50, self._pulse_animation)
+    def _pulse_status(self, elapsed):
+        # Receives have no reliable end event (probes, partial ranges): stop after 1 s of silence
+        if not self.active_sends and time.monotonic() - self.receive_activity > 1.0:
+            return False
+        amount = animation.pulse(elapsed)
+        self.status_label.configure(text_color=animation.blend(COLORS["accent_green"], COLORS["accent_cyan"], amount))
+    
+    def _reset_status_color(self):
+        self.status_label.configure(text_color=COLORS["accent_green"])
     
     # ==================== HEADER ====================
     def _create_header(self):
@@ -445,15 +491,16 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
         self.receiver_frame = ctk.CTkFrame(self.content_frame, fg_color="transparent")
         self.about_frame = ctk.CTkFrame(self.content_frame, fg_color="transparent")
         
-        self._build_sender_tab()
-        self._build_receiver_tab()
-        self._build_about_tab()
+        # Only the visible tab is built now, the others after first paint
+        self._built_tabs = set()
+        self._ensure_tab("sender")
         
         # Show sender tab by default
         self.sender_frame.pack(fill="both", expand=True, padx=15, pady=15)
     
     def _switch_tab(self, tab_name):
         """Switch between tabs with animation"""
+        self._ensure_tab(tab_name)
         self.current_tab = tab_name
         
         # Hide all frames
@@ -585,6 +632,22 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
         )
         browse_btn.pack(padx=15, pady=(15, 5), fill="x")
         
+        # Auto-fit Button (smallest carrier from the library that holds the message)
+        self.auto_fit_btn = ctk.CTkButton(
+            left_panel,
+            text="🎯 AUTO-FIT CARRIER",
+            command=self._auto_fit_carrier,
+            height=35,
+            font=ctk.CTkFont(family="Consolas", size=11, weight="bold"),
+            fg_color=COLORS["bg_card"],
+            hover_color=COLORS["bg_card_hover"],
+            text_color=COLORS["accent_purple"],
+            border_width=1,
+            border_color=COLORS["accent_purple"],
+            corner_radius=8
+        )
+        self.auto_fit_btn.pack(padx=15, pady=(0, 5), fill="x")
+        
         # Capacity Info Label
         self.capacity_label = ctk.CTkLabel(
             left_panel,
@@ -650,7 +713,7 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
         )
         self.message_textbox.pack(fill="x", padx=15, pady=5)
         self.message_textbox.insert("0.0", "")
-        self.message_textbox.bind("<KeyRelease>", self._update_char_count)
+        self.message_textbox.bind("<KeyRelease>", self._schedule_char_count)
         
         # Password Encryption Section
         password_frame = ctk.CTkFrame(right_panel, fg_color="transparent")
@@ -673,6 +736,7 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
             show="•"
         )
         self.sender_password_entry.pack(side="left", padx=10)
+        self.sender_password_entry.bind("<KeyRelease>", self._schedule_char_count)  # Encryption changes the size
         
         self.show_pass_var = ctk.BooleanVar(value=False)
         self.show_pass_btn = ctk.CTkCheckBox(
@@ -730,7 +794,7 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
         
         self.target_ip_entry = ctk.CTkEntry(
             ip_frame, 
-            placeholder_text="xxx.xxx.xxx.xxx",
+            placeholder_text="IP, IP... or group",
             width=150,
             font=ctk.CTkFont(family="Consolas", size=11),
             fg_color=COLORS["bg_dark"],
@@ -770,6 +834,66 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
         )
         self.ping_btn.pack(side="left", padx=(15, 0))
         
+        # LAN Discovery Button
+        self.find_btn = ctk.CTkButton(
+            ip_frame,
+            text="🔍 FIND",
+            command=self._find_receivers,
+            width=70,
+            height=28,
+            font=ctk.CTkFont(family="Consolas", size=10, weight="bold"),
+            fg_color=COLORS["accent_purple"],
+            hover_color=COLORS["accent_magenta"],
+            corner_radius=5
+        )
+        self.find_btn.pack(side="left", padx=(5, 0))
+        
+        # Subnet Scan Button
+        self.scan_btn = ctk.CTkButton(
+            ip_frame,
+            text="🛰 SCAN",
+            command=self._scan_subnet,
+            width=70,
+            height=28,
+            font=ctk.CTkFont(family="Consolas", size=10, weight="bold"),
+            fg_color=COLORS["accent_purple"],
+            hover_color=COLORS["accent_magenta"],
+            corner_radius=5
+        )
+        self.scan_btn.pack(side="left", padx=(5, 0))
+        
+        # Parallel Streams Row
+        streams_frame = ctk.CTkFrame(network_frame, fg_color="transparent")
+        streams_frame.pack(fill="x", padx=15, pady=(0, 5))
+        
+        ctk.CTkLabel(
+            streams_frame, 
+            text="STREAMS:",
+            font=ctk.CTkFont(family="Consolas", size=11),
+            text_color=COLORS["text_secondary"]
+        ).pack(side="left", padx=(0, 5))
+        
+        self.streams_var = ctk.StringVar(value=str(self.config["transport"]["streams"]).upper())
+        self.streams_menu = ctk.CTkOptionMenu(
+            streams_frame,
+            values=["1", "2", "4", "8", "AUTO"],
+            variable=self.streams_var,
+            width=80,
+            height=28,
+            font=ctk.CTkFont(family="Consolas", size=11),
+            fg_color=COLORS["bg_dark"],
+            button_color=COLORS["accent_orange"],
+            button_hover_color="#ff8855"
+        )
+        self.streams_menu.pack(side="left", padx=5)
+        
+        ctk.CTkLabel(
+            streams_frame, 
+            text="parallel connections for large payloads",
+            font=ctk.CTkFont(family="Consolas", size=9),
+            text_color=COLORS["text_secondary"]
+        ).pack(side="left", padx=(10, 0))
+        
         # Ping Status
         self.ping_status = ctk.CTkLabel(
             network_frame,
@@ -810,6 +934,15 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
         )
         self.progress_percent.pack(side="left", padx=(10, 0))
         
+        # Per-target progress for multi-target sends (shown on demand)
+        self.fanout_frame = ctk.CTkScrollableFrame(
+            network_frame,
+            height=90,
+            fg_color=COLORS["bg_dark"],
+            corner_radius=5
+        )
+        self.fanout_rows = {}
+        
         # Send Button
         self.send_btn = ctk.CTkButton(
             network_frame,
@@ -846,10 +979,76 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
         )
         self.sender_log.pack(fill="x", padx=15, pady=(5, 15))
     
+    def _schedule_char_count(self, event=None):
+        """Key handler: recount once typing pauses instead of on every key"""
+        if self.char_count_job:
+            self.after_cancel(self.char_count_job)
+        self.char_count_job = self.after(self.config["ui"]["meter_delay"], self._update_char_count)
+    
     def _update_char_count(self, event=None):
-        """Update character count"""
-        text = self.message_textbox.get("0.0", "end").strip()
-        self.char_count_label.configure(text=f"{len(text)} chars")
+        """Update character count and the capacity meter of the message"""
+        self.char_count_job = None
+        textbox = self.message_textbox._textbox
+        # The message as the encoder strips it, located and counted by Tk itself:
+        # no copy of a multi-megabyte message into Python
+        first = textbox.search(r"\S", "1.0", "end", regexp=True)
+        chars = 0
+        if first:
+            last = textbox.search(r"\S", "end", "1.0", backwards=True, regexp=True) + "+1c"
+            chars = (textbox.count(first, last, "chars") or (0,))[0]
+        self.char_count_label.configure(text=f"{chars:,} chars", text_color=COLORS["text_secondary"])
+        if not self.carrier_info:
+            return
+        password = self.sender_password_entry.get().strip()
+        self.meter_generation += 1
+        estimate = estimated_bits(chars, password)
+        # The count alone is exact for Latin-1 text (ASCII once encrypted, which sizes UTF-8)
+        wider = r"[^\x01-\x7f]" if password else r"[^\x01-\xff]"
+        if not first or not textbox.search(wider, first, "end", regexp=True):
+            self._show_capacity(chars, estimate, 0)
+            return
+        # Wider characters: show the estimate (a lower bound) until the exact size is measured
+        self._show_capacity(chars, estimate, 0, measuring=True)
+        thread = threading.Thread(target=self._measure_message, daemon=True,
+                                  args=(self.meter_generation, textbox.get(first, last), password))
+        thread.start()
+        self.progress.watch(thread)
+    
+    def _measure_message(self, generation, message, password):
+        """Worker thread: exact embedded size of the message as the encoder would write it"""
+        self.progress.call(self._on_message_measured, generation, len(message), embedded_bits(message, password),
+                           unsafe_chars(message, password))
+    
+    def _on_message_measured(self, generation, chars, bits, unsafe):
+        """UI thread: show a measurement unless the message or carrier changed since"""
+        if generation == self.meter_generation and self.carrier_info:
+            self._show_capacity(chars, bits, unsafe)
+    
+    def _show_capacity(self, chars, bits, unsafe, measuring=False):
+        """Show the carrier space left after a message of chars characters and bits bits"""
+        total, width, height, file_size = self.carrier_info
+        used = bits / total if total else 1.0
+        if used > 1:
+            color, note = COLORS["error"], " | ⚠ TOO LONG"
+        elif unsafe:
+            color, note = COLORS["warning"], f" | ⚠ {unsafe} non-Latin chars need a password"
+        else:
+            color = COLORS["warning"] if used > 0.9 else COLORS["text_secondary"]
+            note = " | measuring…" if measuring else ""
+        self.char_count_label.configure(text=f"{chars:,} chars | {used:.0%} of carrier{note}", text_color=color)
+        self.capacity_label.configure(
+            text=f"📐 {width}x{height} | 💾 {format_size(file_size)} | "
+                 f"📝 {format_size(max(0, total - bits) // 8)} free of {format_size(total // 8)}",
+            text_color=color)
+    
+    def _load_capacity(self, filepath):
+        """Show the exact capacity of a newly selected carrier and re-measure the message"""
+        total, width, height = estimate_capacity(filepath)
+        self.carrier_info = (total, width, height, os.path.getsize(filepath))
+        self.capacity_label.configure(
+            text=f"📐 {width}x{height} | 💾 {format_size(self.carrier_info[3])} | 📝 {format_size(total // 8)} free",
+            text_color=COLORS["text_secondary"])
+        self._update_char_count()
     
     def _toggle_password_visibility(self):
         """Toggle password visibility"""
@@ -876,12 +1075,81 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
         
         # Run ping in thread
         def do_ping():
-            result = ping_host(target_ip, port)
-            self.after(0, lambda: self._ping_result(result, target_ip, port))
+            result = ping_host(target_ip, port, hello=True)
+            self.progress.call(lambda: self._ping_result(result, target_ip, port))
         
         thread = threading.Thread(target=do_ping)
         thread.daemon = True
         thread.start()
+        self.progress.watch(thread)
+    
+    def _find_receivers(self):
+        """Broadcast a discovery probe and fill the target field with the receivers that answer"""
+        self.ping_status.configure(text="🔍 Searching LAN...", text_color=COLORS["accent_cyan"])
+        self.find_btn.configure(state="disabled")
+        future = self.transport.submit(discover())
+        future.add_done_callback(lambda f: self.progress.call(self._on_receivers_found, f))
+        self.progress.watch(future)
+    
+    def _on_receivers_found(self, future):
+        """Handle discovery result"""
+        self.find_btn.configure(state="normal")
+        try:
+            receivers = future.result()
+        except Exception as e:
+            self.ping_status.configure(text=f"❌ Discovery failed: {e}", text_color=COLORS["error"])
+            return
+        if not receivers:
+            self.ping_status.configure(text="❌ No receivers found", text_color=COLORS["error"])
+            play_sound("error")
+            return
+        for host, port, name in receivers:
+            self._log_sender(f"[+] Found receiver {name} at {host}:{port}")
+        try:
+            default_port = int(self.target_port_entry.get().strip() or DEFAULT_PORT)
+        except ValueError:
+            default_port = DEFAULT_PORT
+        self.target_ip_entry.delete(0, "end")
+        self.target_ip_entry.insert(0, format_targets(receivers, default_port))
+        self.ping_status.configure(text=f"✅ {len(receivers)} receiver(s) found", text_color=COLORS["success"])
+        play_sound("success")
+    
+    def _scan_subnet(self):
+        """Probe a CIDR range typed in the target field (default: the local /24) for receivers"""
+        text = self.target_ip_entry.get().strip()
+        networks = [item for item in text.replace(",", " ").split() if "/" in item] or None
+        try:
+            port = int(self.target_port_entry.get().strip() or DEFAULT_PORT)
+        except ValueError:
+            port = DEFAULT_PORT
+        
+        self.ping_status.configure(text=f"🛰 Scanning {', '.join(networks or ['local /24'])}...",
+                                   text_color=COLORS["accent_cyan"])
+        self.scan_btn.configure(state="disabled")
+        started = time.perf_counter()
+        future = self.transport.submit(scan_subnet(networks, port))
+        future.add_done_callback(lambda f: self.progress.call(self._on_scan_done, f, port, started))
+        self.progress.watch(future)
+    
+    def _on_scan_done(self, future, port, started):
+        """Handle subnet scan result"""
+        self.scan_btn.configure(state="normal")
+        try:
+            found = future.result()
+        except Exception as e:
+            self.ping_status.configure(text=f"❌ Scan failed: {e}", text_color=COLORS["error"])
+            return
+        elapsed = time.perf_counter() - started
+        if not found:
+            self.ping_status.configure(text=f"❌ No receivers found ({elapsed:.2f}s)", text_color=COLORS["error"])
+            play_sound("error")
+            return
+        for host, version in found:
+            self._log_sender(f"[+] Receiver at {host}:{port} (protocol v{version})")
+        self.target_ip_entry.delete(0, "end")
+        self.target_ip_entry.insert(0, ", ".join(host for host, _ in found))
+        self.ping_status.configure(text=f"✅ {len(found)} receiver(s) in {elapsed:.2f}s", text_color=COLORS["success"])
+        play_sound("success")
     
     def _ping_result(self, success, ip, port):
         """Handle ping result"""
@@ -911,27 +1179,14 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
                 # Check extension
                 ext = os.path.splitext(filepath)[1].lower()
                 if ext in ['.png', '.jpg', '.jpeg', '.bmp']:
-                    self.selected_image_path = filepath
-                    self._display_image(filepath, self.sender_image_label, (280, 200))
-                    self._log_sender(f"[+] Dropped: {os.path.basename(filepath)}")
-                    self._update_status(f"Payload loaded: {os.path.basename(filepath)}")
-                    self.image_status_indicator.configure(text="● LOADED", text_color=COLORS["success"])
-                    
-                    # Show remove button
-                    self.remove_img_btn.place(relx=1.0, x=-10, y=10, anchor="ne")
-                    
-                    # Show capacity info
-                    max_chars, width, height = estimate_capacity(filepath)
-                    file_size = os.path.getsize(filepath)
-                    self.capacity_label.configure(
-                        text=f"📐 {width}x{height} | 💾 {format_size(file_size)} | 📝 ~{max_chars:,} chars max"
-                    )
+                    self._load_image(filepath, "Dropped")
                 else:
                     messagebox.showwarning("⚠️ Invalid File", "Please drop an image file (PNG, JPG, BMP)")
     
     def _clear_image(self):
         """Clear selected image"""
         self.selected_image_path = None
+        self.carrier_info = None
         
         # Create a transparent 1x1 image to force clear
         empty_img = Image.new("RGBA", (1, 1), (0, 0, 0, 0))
@@ -942,6 +1197,7 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
         
         self.image_status_indicator.configure(text="● AWAITING", text_color=COLORS["warning"])
         self.capacity_label.configure(text="")
+        self._update_char_count()
         self._log_sender("[-] Image cleared")
         self._update_status("Payload cleared")
         
@@ -958,9 +1214,8 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
         self.target_port_entry.delete(0, "end")
         self.target_port_entry.insert(0, str(DEFAULT_PORT))
         self.ping_status.configure(text="")
-        self.progress_bar.set(0)
-        self.progress_percent.configure(text="0%")
-        self.progress_label.configure(text="READY")
+        self.progress.post("send", fraction=0, label="READY")
+        self.fanout_frame.pack_forget()
         self.send_btn.configure(state="disabled")
         self._log_sender("[*] Sender tab reset")
         play_sound("click")
@@ -972,21 +1227,77 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
             filetypes=[("Image Files", "*.png *.jpg *.jpeg *.bmp"), ("All Files", "*.*")]
         )
         if filepath:
-            self.selected_image_path = filepath
-            self._display_image(filepath, self.sender_image_label, (280, 200))
-            self._log_sender(f"[+] Loaded: {os.path.basename(filepath)}")
-            self._update_status(f"Payload loaded: {os.path.basename(filepath)}")
-            self.image_status_indicator.configure(text="● LOADED", text_color=COLORS["success"])
-            
-            # Show remove button
-            self.remove_img_btn.place(relx=1.0, x=-10, y=10, anchor="ne")
-            
-            # Show capacity info
-            max_chars, width, height = estimate_capacity(filepath)
-            file_size = os.path.getsize(filepath)
-            self.capacity_label.configure(
-                text=f"📐 {width}x{height} | 💾 {format_size(file_size)} | 📝 ~{max_chars:,} chars max"
-            )
+            self._load_image(filepath)
+    
+    def _load_image(self, filepath, action="Loaded"):
+        """Make filepath the carrier image (browse, drop and auto-fit)"""
+        self.selected_image_path = filepath
+        self._display_image(filepath, self.sender_image_label, (280, 200))
+        self._log_sender(f"[+] {action}: {os.path.basename(filepath)}")
+        self._update_status(f"Payload loaded: {os.path.basename(filepath)}")
+        self.image_status_indicator.configure(text="● LOADED", text_color=COLORS["success"])
+        
+        # Show remove button
+        self.remove_img_btn.place(relx=1.0, x=-10, y=10, anchor="ne")
+        
+        # Show capacity info
+        self._load_capacity(filepath)
+    
+    def _auto_fit_carrier(self):
+        """Pick the smallest carrier in the library that holds the current message"""
+        message = self.message_textbox.get("0.0", "end").strip()
+        if not message:
+            messagebox.showwarning("⚠️ Warning", "Enter a secret message first!")
+            return
+        directory = self.config["carriers"]["dir"]
+        if not directory:
+            directory = filedialog.askdirectory(title="Select Carrier Library")
+            if not directory:
+                return
+            self.config["carriers"]["dir"] = directory  # For this session; set carriers.dir to keep it
+        
+        self.auto_fit_btn.configure(state="disabled")
+        self._log_sender("[~] Checking carrier library...")
+        password = self.sender_password_entry.get().strip()
+        thread = threading.Thread(target=self._auto_fit_worker, args=(directory, message, password))
+        thread.daemon = True
+        thread.start()
+        self.progress.watch(thread)
+    
+    def _auto_fit_worker(self, directory, message, password):
+        """Worker thread: bring the library index up to date, then query it"""
+        try:
+            if self.carriers is None or self.carriers.directory != os.path.abspath(directory):
+                if self.carriers:
+                    self.carriers.close()
+                self.carriers = CarrierLibrary(directory, self.config["carriers"]["index"])
+            indexed, removed = self.carriers.refresh()
+            if indexed or removed:
+                self._log_sender(f"[+] Carrier library: {indexed} indexed, {removed} removed, "
+                                 f"{len(self.carriers)} usable")
+            started = time.perf_counter()
+            carrier = self.carriers.best_fit_for(message, password)
+            elapsed = time.perf_counter() - started
+            self.progress.call(lambda: self._on_carrier_fitted(carrier, elapsed))
+        except Exception as e:
+            self.progress.call(lambda err=e: self._on_auto_fit_failed(err))
+    
+    def _on_carrier_fitted(self, carrier, elapsed):
+        """UI thread: best-fit query finished"""
+        self.auto_fit_btn.configure(state="normal")
+        if carrier is None:
+            self._log_sender("[✗] No carrier in the library is large enough")
+            messagebox.showwarning("⚠️ No Carrier", "No carrier in the library can hold this message.")
+            return
+        self._log_sender(f"[✓] Best fit: {carrier['width']}x{carrier['height']}, "
+                         f"{format_size(carrier['capacity_bits'] // 8)} capacity ({elapsed * 1e6:.0f} µs)")
+        self._load_image(carrier["path"], "Auto-fit")
+    
+    def _on_auto_fit_failed(self, exc):
+        """UI thread: the library could not be read"""
+        self.auto_fit_btn.configure(state="normal")
+        self._log_sender(f"[✗] Carrier library error: {exc}")
+        messagebox.showerror("❌ Error", f"Carrier library error: {exc}")
     
     def _display_image(self, path, label, size):
         """Display image in a label"""
@@ -1010,34 +1321,113 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
             messagebox.showwarning("⚠️ Warning", "Enter a secret message!")
             return
         
+        password = self.sender_password_entry.get().strip()
+        total = self.carrier_info[0] if self.carrier_info else None
+        self.encode_btn.configure(state="disabled")
+        
+        # Measure the text being encoded off the UI thread; _start_encode takes it from there
+        thread = threading.Thread(target=self._measure_worker,
+                                  args=(self.selected_image_path, message, password, total))
+        thread.daemon = True
+        thread.start()
+        self.progress.watch(thread)
+    
+    def _measure_worker(self, image_path, message, password, total):
+        """Worker thread: exact embedded size of the message about to be encoded"""
         try:
-            self._log_sender("[~] Encoding message...")
-            self._update_status("Encoding payload...")
-            
-            # Get password and encrypt if provided
-            password = self.sender_password_entry.get().strip()
-            if password:
-                message = encrypt_message(message, password)
-                self._log_sender("[+] Message encrypted with password")
-            
-            # Use LSB steganography
-            secret_image = lsb.hide(self.selected_image_path, message)
-            output_path = os.path.join(os.path.dirname(self.selected_image_path), "secret_packet.png")
-            secret_image.save(output_path)
-            
-            self.encoded_image_path = output_path
-            self._log_sender(f"[✓] Encoded: secret_packet.png")
-            self._update_status("Message encoded successfully!")
-            self.send_btn.configure(state="normal")
-            play_sound("success")
-            
-            enc_status = " (Encrypted)" if password else ""
-            messagebox.showinfo("✅ Success", f"Message encoded{enc_status}!\nSaved as: secret_packet.png")
+            if total is None:
+                total = estimate_capacity(image_path)[0]
+            needed, unsafe = embedded_bits(message, password), unsafe_chars(message, password)
+        except Exception as e:
+            self.progress.call(lambda err=e: self._on_encode_failed(err))
+            return
+        self.progress.call(lambda: self._start_encode(image_path, message, password, total, needed, unsafe))
+    
+    def _start_encode(self, image_path, message, password, total, needed, unsafe):
+        """UI thread: refuse or confirm the measured message, then start the encode worker"""
+        if self.carrier_info:
+            self._show_capacity(len(message), needed, unsafe)  # Exact figures for the text being encoded
+        # Fail here rather than deep inside lsb.hide after the carrier is decoded
+        if total and needed > total:
+            self._log_sender(f"[✗] Message needs {format_size(needed // 8)}, carrier holds {format_size(total // 8)}")
+            self.encode_btn.configure(state="normal")
+            messagebox.showwarning("⚠️ Message Too Long",
+                                   f"The message needs {format_size(needed // 8)} but this image holds "
+                                   f"{format_size(total // 8)}.\nUse a larger image or a shorter message.")
+            return
+        if unsafe and not messagebox.askyesno(
+                "⚠️ Unsupported Characters",
+                f"{unsafe} character(s) above U+00FF will be garbled when revealed.\n"
+                "Set a password to send them intact. Encode anyway?"):
+            self.encode_btn.configure(state="normal")
+            return
+        
+        self._log_sender("[~] Encoding message...")
+        self._update_status("Encoding payload...")
+        self.progress.post("send", fraction=0, label="ENCODING")
+        
+        # Run in worker thread to prevent UI freeze on large images
+        worker = profile.wrap("encode", self._encode_worker, self._log_sender)
+        thread = threading.Thread(target=worker, args=(image_path, message, password))
+        thread.daemon = True
+        thread.start()
+        self.progress.watch(thread)
+    
+    def _encode_worker(self, image_path, message, password):
+        """Worker thread: encrypt, hide and save, reporting each stage to the progress bus"""
+        try:
+            with trace.Trace("encode", carrier=os.path.basename(image_path), message_chars=len(message),
+                             encrypted=bool(password)) as record:
+                # Get password and encrypt if provided
+                if password:
+                    message = encrypt_message(message, password)
+                    self._log_sender("[+] Message encrypted with password")
+                self.progress.post("send", fraction=0.2)
+                
+                # Use LSB steganography
+                with Image.open(image_path) as carrier:
+                    with metrics.timed("carrier_decode"):
+                        carrier.load()
+                    with metrics.timed("embed"):
+                        secret_image = engine.embed(carrier, message)
+                    pixels = carrier.width * carrier.height
+                self.progress.post("send", fraction=0.7)
+                output_dir = os.path.dirname(image_path)
+                if self.carriers and os.path.commonpath(
+                        [os.path.abspath(output_dir), self.carriers.directory]) == self.carriers.directory:
+                    output_dir = os.path.dirname(os.path.abspath(__file__))  # Keep packets out of the library
+                output_path = os.path.join(output_dir, "secret_packet.png")
+                with metrics.timed("png_save"):
+                    secret_image.save(output_path)
+                if trace.enabled():
+                    record.update(sha256=file_sha256(output_path), size=os.path.getsize(output_path),
+                                  pixels=pixels)
             
+            self.progress.post("send", fraction=1.0, label="ENCODED")
+            self.progress.call(lambda: self._on_encoded(image_path, output_path, password))
         except Exception as e:
-            self._log_sender(f"[✗] Error: {e}")
-            play_sound("error")
-            messagebox.showerror("❌ Error", f"Failed to encode: {e}")
+            self.progress.post("send", fraction=0, label="ERROR")
+            self.progress.call(lambda err=e: self._on_encode_failed(err))
+    
+    def _on_encoded(self, image_path, output_path, password):
+        """UI thread: encoding finished"""
+        self.encoded_image_path = output_path
+        self.encoded_carrier_path = image_path
+        self._log_sender(f"[✓] Encoded: secret_packet.png")
+        self._update_status("Message encoded successfully!")
+        self.encode_btn.configure(state="normal")
+        self.send_btn.configure(state="normal")
+        play_sound("success")
+        
+        enc_status = " (Encrypted)" if password else ""
+        messagebox.showinfo("✅ Success", f"Message encoded{enc_status}!\nSaved as: secret_packet.png")
+    
+    def _on_encode_failed(self, exc):
+        """UI thread: encoding raised"""
+        self._log_sender(f"[✗] Error: {exc}")
+        self.encode_btn.configure(state="normal")
+        play_sound("error")
+        messagebox.showerror("❌ Error", f"Failed to encode: {exc}")
     
     def _send_file(self):
         """Send the encoded file to receiver"""
@@ -1045,8 +1435,8 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
             messagebox.showwarning("⚠️ Warning", "Encode a message first!")
             return
         
-        target_ip = self.target_ip_entry.get().strip()
-        if not target_ip:
+        targets = resolve_targets(self.target_ip_entry.get(), self.config["groups"])
+        if not targets:
             messagebox.showwarning("⚠️ Warning", "Enter target IP address!")
             return
         
@@ -1055,86 +1445,191 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
         except ValueError:
             port = DEFAULT_PORT
         
-        # Run in thread to prevent UI freeze
-        thread = threading.Thread(target=self._send_file_thread, args=(target_ip, port))
-        thread.daemon = True
-        thread.start()
+        streams = self.streams_var.get().lower()
+        
+        # Run on the transport loop to prevent UI freeze
+        if len(targets) > 1:
+            self._build_fanout_rows(targets)
+            send_many = profile.wrap("send", self._send_many_task, self._log_sender)
+            future = self.transport.submit(send_many(targets, port, streams))
+        else:
+            self.fanout_frame.pack_forget()
+            target_ip, port = parse_target(targets[0], port)
+            send_one = profile.wrap("send", self._send_file_task, self._log_sender)
+            future = self.transport.submit(send_one(target_ip, port, streams))
+        self.active_sends += 1
+        future.add_done_callback(lambda f: self.progress.call(self._send_finished))
+        self.progress.watch(future)
+        self._animate_transfer()
     
-    def _send_file_thread(self, target_ip, port):
-        """Thread function to send file with progress bar"""
+    def _build_fanout_rows(self, targets):
+        """Create one progress row per receiver of a multi-target send"""
+        for child in self.fanout_frame.winfo_children():
+            child.destroy()
+        for target in self.fanout_rows:
+            self.progress.unsubscribe(("fanout", target))
+        self.fanout_rows = {}
+        for target in targets:
+            row = ctk.CTkFrame(self.fanout_frame, fg_color="transparent")
+            row.pack(fill="x", pady=1)
+            
+            ctk.CTkLabel(
+                row,
+                text=target,
+                width=130,
+                anchor="w",
+                font=ctk.CTkFont(family="Consolas", size=9),
+                text_color=COLORS["text_secondary"]
+            ).pack(side="left")
+            
+            bar = ctk.CTkProgressBar(
+                row,
+                height=8,
+                corner_radius=4,
+                progress_color=COLORS["accent_cyan"],
+                fg_color=COLORS["bg_card"]
+            )
+            bar.pack(side="left", fill="x", expand=True, padx=5)
+            bar.set(0)
+            
+            status = ctk.CTkLabel(
+                row,
+                text="QUEUED",
+                width=60,
+                font=ctk.CTkFont(family="Consolas", size=9),
+                text_color=COLORS["text_secondary"]
+            )
+            status.pack(side="left")
+            self.fanout_rows[target] = (bar, status)
+            self.progress.subscribe(("fanout", target), lambda t=target, **fields: self._show_target_progress(t, **fields))
+        self.fanout_frame.pack(fill="x", padx=15, pady=(0, 5), before=self.send_btn)
+    
+    async def _send_many_task(self, targets, port, streams):
+        """Transport task to send the packet to several receivers at once"""
+        progress = dict.fromkeys(targets, 0.0)
+        
+        def on_progress(target, bytes_sent, filesize):
+            if not filesize:
+                return
+            progress[target] = bytes_sent / filesize
+            self.progress.post(("fanout", target), fraction=progress[target], status="SENDING",
+                               color=COLORS["accent_cyan"])
+            self.progress.post("send", fraction=sum(progress.values()) / len(targets))
+        
+        def on_stage(target, stage, nbytes):
+            if stage == "delta":
+                self._log_sender(f"[+] {target}: carrier cached, sending {format_size(nbytes)} delta")
+        
+        def on_result(target, exc):
+            if exc is None:
+                progress[target] = 1.0
+                self._log_sender(f"[✓] {target}: delivered")
+                self.progress.post(("fanout", target), fraction=1.0, status="DONE", color=COLORS["success"])
+            else:
+                self._log_sender(f"[✗] {target}: {str(exc) or type(exc).__name__}")
+                self.progress.post(("fanout", target), status="FAILED", color=COLORS["error"])
+        
+        try:
+            self._log_sender(f"[~] Broadcasting to {len(targets)} receivers...")
+            self._update_status(f"Broadcasting to {len(targets)} receivers...")
+            self.progress.post("send", fraction=0, label="BROADCASTING")
+            results = await send_to_many(targets, self.encoded_image_path, self.encoded_carrier_path, port,
+                                         on_progress=on_progress, on_stage=on_stage, on_result=on_result,
+                                         streams=streams)
+        except Exception as e:
+            self._log_sender(f"[✗] Error: {e}")
+            self._update_status("Transmission failed")
+            self.progress.post("send", label="ERROR")
+            play_sound("error")
+            self.progress.call(lambda err=e: messagebox.showerror("❌ Error", f"Failed to send: {err}"))
+            return
+        
+        failed = [target for target, result in results.items() if isinstance(result, Exception)]
+        delivered = len(targets) - len(failed)
+        self._log_sender(f"[*] Broadcast finished: {delivered}/{len(targets)} delivered")
+        self._update_status(f"Payload delivered to {delivered}/{len(targets)} receivers")
+        self.progress.post("send", label="COMPLETE" if not failed else "PARTIAL")
+        if failed:
+            play_sound("error")
+            self.progress.call(lambda: messagebox.showwarning(
+                "⚠️ Warning", f"Delivered to {delivered}/{len(targets)} receivers.\nFailed: {', '.join(failed)}"))
+        else:
+            play_sound("send")
+            self.progress.call(lambda: messagebox.showinfo("✅ Success", f"Payload delivered to all {len(targets)} receivers!"))
+    
+    async def _send_file_task(self, target_ip, port, streams):
+        """Transport task to send file with progress bar"""
         try:
             self._log_sender(f"[~] Connecting to {target_ip}:{port}...")
             self._update_status(f"Establishing connection...")
-            self.after(0, lambda: self.progress_label.configure(text="CONNECTING"))
-            self.after(0, lambda: self.progress_bar.set(0.1))
+            self.progress.post("send", fraction=0.1, label="CONNECTING")
             
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.settimeout(10)
-            s.connect((target_ip, port))
+            def on_progress(bytes_sent, filesize):
+                if bytes_sent == 0:
+                    return
+                self.progress.post("send", fraction=bytes_sent / filesize)
             
-            self._log_sender("[+] Connected! Transmitting...")
-            self.after(0, lambda: self.progress_label.configure(text="TRANSMITTING"))
+            def on_retry(attempt, exc):
+                self._log_sender(f"[!] Connection lost ({exc}), resuming (retry {attempt})...")
+                self.progress.post("send", label="RESUMING")
             
-            filesize = os.path.getsize(self.encoded_image_path)
-            filename = os.path.basename(self.encoded_image_path)
+            def on_stage(stage, nbytes):
+                if stage == "delta":
+                    self._log_sender(f"[+] Receiver has the carrier, sending {format_size(nbytes)} delta")
+                elif stage == "carrier":
+                    self._log_sender(f"[~] Caching carrier on receiver ({format_size(nbytes)})...")
             
-            # Send header
-            s.send(f"{filename}{SEPARATOR}{filesize}".encode())
-            time.sleep(0.5)
-            
-            # Send file with progress
-            bytes_sent = 0
-            with open(self.encoded_image_path, "rb") as f:
-                while True:
-                    bytes_read = f.read(BUFFER_SIZE)
-                    if not bytes_read:
-                        break
-                    s.sendall(bytes_read)
-                    bytes_sent += len(bytes_read)
-                    # Update progress
-                    progress = bytes_sent / filesize
-                    percent = int(progress * 100)
-                    self.after(0, lambda p=progress: self.progress_bar.set(p))
-                    self.after(0, lambda pct=percent: self.progress_percent.configure(text=f"{pct}%"))
+            self.progress.post("send", label="TRANSMITTING")
+            await send_packet(target_ip, port, self.encoded_image_path, self.encoded_carrier_path,
+                              on_progress, on_retry=on_retry, streams=streams, on_stage=on_stage)
             
             self._log_sender("[✓] Transmission complete!")
             self._update_status("Payload transmitted!")
-            self.after(0, lambda: self.progress_label.configure(text="COMPLETE"))
-            self.after(0, lambda: self.progress_bar.set(1.0))
-            self.after(0, lambda: self.progress_percent.configure(text="100%"))
-            s.close()
+            self.progress.post("send", fraction=1.0, label="COMPLETE")
             
             play_sound("send")
-            self.after(0, lambda: messagebox.showinfo("✅ Success", "Payload transmitted successfully!"))
+            self.progress.call(lambda: messagebox.showinfo("✅ Success", "Payload transmitted successfully!"))
             
-        except socket.timeout:
+        except (asyncio.TimeoutError, socket.timeout):
             self._log_sender("[✗] Connection timeout!")
             self._update_status("Connection timeout")
-            self.after(0, lambda: self.progress_label.configure(text="FAILED"))
-            self.after(0, lambda: self.progress_bar.set(0))
+            self.progress.post("send", fraction=0, label="FAILED")
             play_sound("error")
-            self.after(0, lambda: messagebox.showerror("❌ Error", "Connection timeout!\nMake sure receiver is running."))
+            self.progress.call(lambda: messagebox.showerror("❌ Error", "Connection timeout!\nMake sure receiver is running."))
         except ConnectionRefusedError:
             self._log_sender("[✗] Connection refused!")
             self._update_status("Connection refused")
-            self.after(0, lambda: self.progress_label.configure(text="FAILED"))
-            self.after(0, lambda: self.progress_bar.set(0))
+            self.progress.post("send", fraction=0, label="FAILED")
             play_sound("error")
-            self.after(0, lambda: messagebox.showerror("❌ Error", "Connection refused!\nMake sure receiver is running."))
+            self.progress.call(lambda: messagebox.showerror("❌ Error", "Connection refused!\nMake sure receiver is running."))
         except Exception as e:
             self._log_sender(f"[✗] Error: {e}")
             self._update_status("Transmission failed")
-            self.after(0, lambda: self.progress_label.configure(text="ERROR"))
-            self.after(0, lambda: self.progress_bar.set(0))
+            self.progress.post("send", fraction=0, label="ERROR")
             play_sound("error")
-            self.after(0, lambda: messagebox.showerror("❌ Error", f"Failed to send: {e}"))
+            self.progress.call(lambda err=e: messagebox.showerror("❌ Error", f"Failed to send: {err}"))
+    
+    def _show_send_progress(self, fraction=None, label=None):
+        """Progress bus handler for the sender progress bar"""
+        if fraction is not None:
+            self.progress_bar.set(fraction)
+            self.progress_percent.configure(text=f"{int(fraction * 100)}%")
+        if label:
+            self.progress_label.configure(text=label)
+    
+    def _show_target_progress(self, target, fraction=None, status=None, color=None):
+        """Progress bus handler for one row of a multi-target send"""
+        if target not in self.fanout_rows:
+            return
+        bar, status_label = self.fanout_rows[target]
+        if fraction is not None:
+            bar.set(fraction)
+        if status:
+            status_label.configure(text=status, text_color=color or COLORS["text_secondary"])
     
     def _log_sender(self, text):
-        """Add text to sender log"""
-        self.sender_log.configure(state="normal")
-        self.sender_log.insert("end", f"{text}\n")
-        self.sender_log.see("end")
-        self.sender_log.configure(state="disabled")
+        """Add text to sender log (safe from any thread)"""
+        self.sender_logs.write(text)
     
     # ==================== RECEIVER TAB ====================
     def _build_receiver_tab(self):
@@ -1395,12 +1890,60 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
         self.server_status_indicator.configure(text="● LISTENING", text_color=COLORS["accent_green"])
         self._update_status(f"Server listening on port {DEFAULT_PORT}")
         
-        # Start server in thread
-        thread = threading.Thread(target=self._server_thread)
-        thread.daemon = True
-        thread.start()
-        
-        self._log_receiver(f"[+] Server started on {get_local_ip()}:{DEFAULT_PORT}")
+        # Received packets are filed by content hash and catalogued
+        if self.config["store"]["enabled"] and self.store is None:
+            self.store = PacketStore(RECEIVED_DIR)
+        
+        # Start server on the transport loop
+        self.server_task = self.transport.submit(profile.wrap("server", serve, self._log_receiver)(
+            port=DEFAULT_PORT,
+            on_connect=self._on_server_connect,
+            on_header=self._on_server_header,
+            on_progress=self._on_server_progress,
+            on_received=self._on_server_received,
+            on_error=self._on_server_error,
+            store=self.store
+        ))
+        self.server_task.add_done_callback(self._on_server_done)
+        self.progress.watch(self.server_task)  # Transport callbacks reach the UI while listening
+        
+        # Answer LAN discovery probes while listening
+        self.announce_task = self.transport.submit(announce(DEFAULT_PORT))
+        self.announce_task.add_done_callback(self._on_announce_done)
+        
+        addresses = ", ".join(local_addresses()) or get_local_ip()
+        self._log_receiver(f"[+] Server started on {addresses} (port {DEFAULT_PORT})")
+        
+        # Reveal packets in background worker processes as they land
+        if self.config["spool"]["auto_reveal"] and self.spool is None:
+            self.spool = Spool(RECEIVED_DIR, catalog=self.store.catalog if self.store else None)
+            self.transport.submit(self._spool_backlog())
+    
+    async def _spool_backlog(self):
+        """Queue packets received earlier that were never revealed"""
+        for path, digest in self.spool.pending():
+            self._spool_packet(path, sha256=digest)
+    
+    def _spool_packet(self, path, **info):
+        """Transport thread: hand a packet to the reveal workers"""
+        future = self.spool.submit(path, **info)
+        future.add_done_callback(lambda f, p=path: self._on_packet_revealed(p, f))
+        self.progress.call(self.progress.watch, future)  # Results may land after the server stops
+    
+    def _on_packet_revealed(self, path, future):
+        """Transport callback: a reveal worker finished a packet"""
+        if future.cancelled():
+            return
+        if future.exception():
+            self._log_receiver(f"[!] Auto-reveal failed for {os.path.basename(path)}: {future.exception()}")
+            return
+        result = future.result()
+        if result["error"]:
+            self._log_receiver(f"[!] {os.path.basename(path)}: no message ({result['error']})")
+        elif result["encrypted"] and not result["decrypted"]:
+            self._log_receiver(f"[🔒] {os.path.basename(path)}: encrypted, no configured password matched")
+        else:
+            self._log_receiver(f"[✓] {os.path.basename(path)}: revealed in {result['reveal_seconds']:.2f}s")
     
     def _show_qr_code(self):
         """Show QR code with IP:Port for easy sharing"""
@@ -1467,7 +2010,7 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
         self.revealed_message_box.delete("0.0", "end")
         self.revealed_message_box.configure(state="disabled")
         
-        self.receiver_status_indicator.configure(text="● WAITING", text_color=COLORS["warning"])
+        self.progress.post("receive", text="● WAITING", color=COLORS["warning"])
         self.reveal_btn.configure(state="disabled")
         
         self._log_receiver("[*] Receiver tab reset")
@@ -1476,11 +2019,12 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
     def _stop_server(self):
         """Stop the receiver server"""
         self.server_running = False
-        if self.server_socket:
-            try:
-                self.server_socket.close()
-            except:
-                pass
+        if self.server_task:
+            self.server_task.cancel()
+            self.server_task = None
+        if self.announce_task:
+            self.announce_task.cancel()
+            self.announce_task = None
         
         self.start_server_btn.configure(state="normal")
         self.stop_server_btn.configure(state="disabled")
@@ -1488,67 +2032,60 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
         self._update_status("Server stopped")
         self._log_receiver("[!] Server stopped")
     
-    def _server_thread(self):
-        """Thread function to run server"""
-        try:
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.server_socket.bind(("0.0.0.0", DEFAULT_PORT))
-            self.server_socket.listen(1)
-            self.server_socket.settimeout(1)
-            
-            while self.server_running:
-                try:
-                    client_socket, address = self.server_socket.accept()
-                    self._log_receiver(f"[+] Connection from {address[0]}")
-                    self._update_status(f"Receiving from {address[0]}...")
-                    
-                    # Receive header
-                    received = client_socket.recv(BUFFER_SIZE).decode()
-                    filename, filesize = received.split(SEPARATOR)
-                    filename = "received_" + os.path.basename(filename)
-                    filesize = int(filesize)
-                    
-                    self._log_receiver(f"[~] Receiving: {filename} ({filesize} bytes)")
-                    
-                    received_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "received")
-                    os.makedirs(received_dir, exist_ok=True)
-                    output_path = os.path.join(received_dir, filename)
-                    with open(output_path, "wb") as f:
-                        bytes_received = 0
-                        while bytes_received < filesize:
-                            bytes_read = client_socket.recv(BUFFER_SIZE)
-                            if not bytes_read:
-                                break
-                            f.write(bytes_read)
-                            bytes_received += len(bytes_read)
-                    
-                    client_socket.close()
-                    
-                    self.received_image_path = output_path
-                    self._log_receiver(f"[✓] Saved: {filename}")
-                    self._update_status("Payload received!")
-                    
-                    # Update UI
-                    self.after(0, lambda p=output_path: self._display_image(p, self.receiver_image_label, (280, 200)))
-                    self.after(0, lambda: self.reveal_btn.configure(state="normal"))
-                    self.after(0, lambda: self.receiver_status_indicator.configure(text="● RECEIVED", text_color=COLORS["success"]))
-                    self.after(0, lambda: messagebox.showinfo("📥 Received", f"Payload received: {filename}"))
-                    
-                except socket.timeout:
-                    continue
-                except Exception as e:
-                    if self.server_running:
-                        self._log_receiver(f"[!] Error: {e}")
-        
-        except Exception as e:
-            self._log_receiver(f"[✗] Server error: {e}")
-        finally:
-            if self.server_socket:
-                try:
-                    self.server_socket.close()
-                except:
-                    pass
+    def _on_server_connect(self, peer):
+        """Transport callback: a sender connected"""
+        self._log_receiver(f"[+] Connection from {peer}")
+        self._update_status(f"Receiving from {peer}...")
+    
+    def _on_server_header(self, peer, filename, filesize, offset):
+        """Transport callback: header parsed and resume offset agreed"""
+        self.receive_activity = time.monotonic()
+        self.progress.call(self._animate_transfer)
+        if offset:
+            self._log_receiver(f"[~] Resuming: {filename} at {offset}/{filesize} bytes")
+        else:
+            self._log_receiver(f"[~] Receiving: {filename} ({filesize} bytes)")
+    
+    def _on_server_progress(self, peer, received, total):
+        """Transport callback: bytes of the current payload arrived"""
+        self.receive_activity = time.monotonic()
+        percent = int(received / total * 100) if total else 100
+        self.progress.post("receive", text=f"● RECEIVING {percent}%", color=COLORS["accent_cyan"])
+    
+    def _on_server_received(self, peer, output_path, filesize, digest):
+        """Transport callback: a payload was verified and saved to disk"""
+        filename = os.path.basename(output_path)
+        self.received_image_path = output_path
+        if self.spool:
+            self._spool_packet(output_path, peer=peer, sha256=digest)
+        self._log_receiver(f"[✓] Saved: {filename} ({filesize} bytes)")
+        self._log_receiver(f"[✓] SHA-256 verified: {digest[:16]}…")
+        self._update_status("Payload received!")
+        
+        # Update UI
+        self.progress.call(lambda p=output_path: self._display_image(p, self.receiver_image_label, (280, 200)))
+        self.progress.call(lambda: self.reveal_btn.configure(state="normal"))
+        self.progress.post("receive", text="● RECEIVED", color=COLORS["success"])
+        self.progress.call(lambda: messagebox.showinfo("📥 Received", f"Payload received: {filename}"))
+    
+    def _on_server_error(self, peer, exc):
+        """Transport callback: a single transfer failed"""
+        if self.server_running:
+            self._log_receiver(f"[!] Error: {exc}")
+    
+    def _on_server_done(self, future):
+        """Transport callback: the server task ended"""
+        if future.cancelled():
+            return
+        exc = future.exception()
+        if exc:
+            self._log_receiver(f"[✗] Server error: {exc}")
+            self.progress.call(self._stop_server)
+    
+    def _on_announce_done(self, future):
+        """Transport callback: the discovery responder ended"""
+        if not future.cancelled() and future.exception():
+            self._log_receiver(f"[!] LAN discovery unavailable: {future.exception()}")
     
     def _toggle_receiver_password_visibility(self):
         """Toggle receiver password visibility"""
@@ -1563,45 +2100,84 @@ class StegovertApp(ctk.CTk, TkinterDnD.DnDWrapper if HAS_DND else object):
             messagebox.showwarning("⚠️ Warning", "No payload received yet!")
             return
         
+        password = self.receiver_password_entry.get().strip()
+        self._log_receiver("[~] Extracting message...")
+        self._update_status("Decrypting...")
+        self.reveal_btn.configure(state="disabled")
+        self.progress.post("receive", text="● EXTRACTING", color=COLORS["accent_cyan"])
+        
+        # Run in worker thread to prevent UI freeze on large images
+        worker = profile.wrap("reveal", self._reveal_worker, self._log_receiver)
+        thread = threading.Thread(target=worker, args=(self.received_image_path, password))
+        thread.daemon = True
+        thread.start()
+        self.progress.watch(thread)
+    
+    def _reveal_worker(self, image_path, password):
+        """Worker thread: extract and decrypt, reporting each stage to the progress bus"""
         try:
-            self._log_receiver("[~] Extracting message...")
-            self._update_status("Decrypting...")
-            
-            message = lsb.reveal(self.received_image_path)
-            
-            if message:
+            with trace.Trace("reveal", packet=os.path.basename(image_path)) as record:
+                if trace.enabled():
+                    record.update(sha256=file_sha256(image_path))
+                # The spool workers usually revealed the packet already
+                result = load_result(image_path)
+                if result and result["revealed"]:
+                    message = result["message"] if result["message"] is not None else result["payload"]
+                    self._log_receiver("[+] Using background reveal result")
+                    record.update(cached=True)
+                else:
+                    with metrics.timed("reveal"):
+                        message = engine.extract(image_path)
+                
                 # Check if message is encrypted and decrypt if password provided
-                password = self.receiver_password_entry.get().strip()
-                if message.startswith("ENC:"):
+                if message and message.startswith("ENC:"):
                     if password:
+                        self.progress.post("receive", text="● DECRYPTING")
                         message = decrypt_message(message, password)
                         self._log_receiver("[+] Message decrypted with password")
                     else:
                         self._log_receiver("[!] Encrypted message - password required")
                         message = "[🔒 ENCRYPTED MESSAGE]\n\nEnter the password and click Decrypt again."
-                
-                self.revealed_message_box.configure(state="normal")
-                self.revealed_message_box.delete("0.0", "end")
-                self.revealed_message_box.insert("0.0", message)
-                self.revealed_message_box.configure(state="disabled")
-                
-                self._log_receiver("[✓] Message revealed!")
-                self._update_status("Message revealed!")
-                play_sound("success")
-            else:
-                messagebox.showinfo("ℹ️ Info", "No hidden message found.")
-                
+            self.progress.call(lambda: self._on_revealed(message))
         except Exception as e:
-            self._log_receiver(f"[✗] Error: {e}")
-            play_sound("error")
-            messagebox.showerror("❌ Error", f"Decryption failed: {e}")
+            self.progress.call(lambda err=e: self._on_reveal_failed(err))
+    
+    def _on_revealed(self, message):
+        """UI thread: extraction finished"""
+        self.reveal_btn.configure(state="normal")
+        if not message:
+            self.progress.post("receive", text="● RECEIVED", color=COLORS["success"])
+            messagebox.showinfo("ℹ️ Info", "No hidden message found.")
+            return
+        
+        self.revealed_message_box.configure(state="normal")
+        self.revealed_message_box.delete("0.0", "end")
+        self.revealed_message_box.insert("0.0", message)
+        self.revealed_message_box.configure(state="disabled")
+        
+        self._log_receiver("[✓] Message revealed!")
+        self._update_status("Message revealed!")
+        self.progress.post("receive", text="● REVEALED", color=COLORS["success"])
+        play_sound("success")
+    
+    def _on_reveal_failed(self, exc):
+        """UI thread: extraction or decryption raised"""
+        self.reveal_btn.configure(state="normal")
+        self.progress.post("receive", text="● RECEIVED", color=COLORS["success"])
+        self._log_receiver(f"[✗] Error: {exc}")
+        play_sound("error")
+        messagebox.showerror("❌ Error", f"Decryption failed: {exc}")
+    
+    def _show_receive_progress(self, text=None, color=None):
+        """Progress bus handler for the receiver status indicator"""
+        if text:
+            self.receiver_status_indicator.configure(text=text)
+        if color:
+            self.receiver_status_indicator.configure(text_color=color)
     
     def _log_receiver(self, text):
-        """Add text to receiver log"""
-        self.receiver_log.configure(state="normal")
-        self.receiver_log.insert("end", f"{text}\n")
-        self.receiver_log.see("end")
-        self.receiver_log.configure(state="disabled")
+        """Add text to receiver log (safe from any thread)"""
+        self.receiver_logs.write(text)
     
     # ==================== ABOUT TAB ====================
     def _build_about_tab(self):
@@ -1734,14 +2310,27 @@ dan mengirimnya melalui jaringan TCP.
         deco_label.pack(expand=True, pady=12)
     
     def _update_status(self, text):
-        """Update status bar text"""
+        """Update status bar text (safe from any thread, delivered through the progress bus)"""
+        self.progress.post("status", text=text)
+    
+    def _show_status(self, text):
+        """Progress bus handler for the status bar"""
         self.status_label.configure(text=f"⚡ {text.upper()}")
     
     def _on_closing(self):
         """Handle window close event"""
-        self.animation_running = False
+        self.animations.stop_all()
         if self.server_running:
             self._stop_server()
+        if self.spool:
+            self.spool.close()
+        self.transport.stop()
+        if self.metrics_server:
+            self.metrics_server.shutdown()
+        if self.store:
+            self.store.close()
+        if self.carriers:
+            self.carriers.close()
         self.destroy()
 
 
@@ -0,0 +1,88 @@
+"""
+STEGOVERT - Log Pipeline
+Antrean log yang aman antar-thread, ditulis ke textbox secara batch dengan buffer cincin terbatas.
+"""
+
+import collections
+import logging
+import logging.handlers
+import queue
+import threading
+
+LOGGER_NAME = "stegovert"
+
+
+def attach_log_file(path, max_bytes=1024 * 1024, backups=3):
+    """Mirror every pipeline's lines to a rotating log file"""
+    handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                                   encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s [%(name)s] %(message)s"))
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return handler
+
+
+class LogPipeline:
+    """Log sink for one Tk textbox.
+
+    write() only enqueues, so any thread may call it. The first line queued after a
+    drain hands one drain to the UI thread through bus (a pystegano_progress.ProgressBus),
+    which inserts everything queued by then as a single batch; with nothing logged no
+    timer runs. The last max_lines lines are kept in a ring buffer and the textbox is
+    trimmed to match, so memory and redraw cost stay flat on long-running sessions.
+    textbox may be None for a tab that is not built yet: lines queue up until attach().
+    """
+    def __init__(self, textbox, name, bus, max_lines=1000):
+        self.textbox = textbox
+        self.bus = bus
+        self.max_lines = max_lines
+        self.lines = collections.deque(maxlen=max_lines)
+        self.logger = logging.getLogger(f"{LOGGER_NAME}.{name}")
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._scheduled = False
+
+    def attach(self, textbox):
+        """Start showing the log in textbox, including everything queued so far"""
+        self.textbox = textbox
+        self._drain()
+
+    def write(self, text):
+        """Queue one log line (thread-safe)"""
+        self._queue.put(text)
+        self.logger.info(text)
+        with self._lock:
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.bus.call(self._drain)
+
+    def history(self):
+        """The retained lines, oldest first"""
+        return list(self.lines)
+
+    def _drain(self):
+        with self._lock:
+            self._scheduled = False  # Before emptying: a line queued from here on schedules again
+        if self.textbox is None:
+            return
+        batch = []
+        try:
+            while True:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        if batch:
+            self._flush(batch[-self.max_lines:])
+
+    def _flush(self, batch):
+        self.lines.extend(batch)
+        self.textbox.configure(state="normal")
+        self.textbox.insert("end", "".join(f"{line}\n" for line in batch))
+        # Line count excluding the trailing empty line after the last newline
+        excess = int(self.textbox.index("end-1c").split(".")[0]) - 1 - self.max_lines
+        if excess > 0:
+            self.textbox.delete("1.0", f"{excess + 1}.0")
+        self.textbox.see("end")
+        self.textbox.configure(state="disabled")
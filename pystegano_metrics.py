@@ -0,0 +1,187 @@
+"""
+STEGOVERT - Metrics
+Penghitung dan histogram latensi per tahap, byte/paket per peer, dan endpoint HTTP format Prometheus.
+"""
+
+import bisect
+import contextlib
+import json
+import threading
+import time
+
+from pystegano_config import DEFAULT_CONFIG
+
+# ===================== KONFIGURASI =====================
+# Histogram bucket upper bounds in seconds (Prometheus "le")
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+STAGES = ("carrier_decode", "estimate_capacity", "encrypt", "embed", "png_save",
+          "connect", "transmit", "receive", "reveal", "decrypt")
+
+# Tunables from the "metrics" section of the config file
+SETTINGS = dict(DEFAULT_CONFIG["metrics"])
+
+
+def configure(options):
+    """Apply metrics settings (see pystegano_config.DEFAULT_CONFIG["metrics"])"""
+    SETTINGS.update(options)
+
+
+# ===================== REGISTRY =====================
+class Histogram:
+    """Latency distribution over BUCKETS, plus count and sum"""
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def cumulative(self):
+        """(le, count of observations <= le) pairs, ending with +Inf"""
+        total = 0
+        for bound, count in zip(BUCKETS + (float("inf"),), self.buckets):
+            total += count
+            yield bound, total
+
+
+_lock = threading.Lock()
+_stages = {stage: Histogram() for stage in STAGES}
+_failures = dict.fromkeys(STAGES, 0)
+_peers = {}  # (direction, peer) -> [packets, bytes]; direction is "sent" or "received"
+_observers = []  # Called with (stage, seconds) after every observation
+
+
+def add_observer(callback):
+    """Also pass every stage duration to callback(stage, seconds), e.g. the trace sink"""
+    _observers.append(callback)
+
+
+def observe(stage, seconds):
+    """Record one duration of a stage"""
+    with _lock:
+        _stages.setdefault(stage, Histogram()).observe(seconds)
+    for callback in _observers:
+        callback(stage, seconds)
+
+
+@contextlib.contextmanager
+def timed(stage, timings=None):
+    """Time the block as one run of stage. A block that raises counts as a failure instead.
+    timings (a dict) also receives the duration, e.g. to carry it out of a worker process."""
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        with _lock:
+            _failures[stage] = _failures.get(stage, 0) + 1
+        raise
+    elapsed = time.perf_counter() - started
+    observe(stage, elapsed)
+    if timings is not None:
+        timings[stage] = elapsed
+
+
+def record_transfer(direction, peer, nbytes, packets=1):
+    """Count bytes and packets exchanged with a peer ("sent" or "received")"""
+    with _lock:
+        totals = _peers.setdefault((direction, peer), [0, 0])
+        totals[0] += packets
+        totals[1] += nbytes
+
+
+def snapshot():
+    """Copy of every metric as plain data (also served as /metrics.json)"""
+    with _lock:
+        stages = {
+            stage: {"count": h.count, "sum": h.sum, "failures": _failures.get(stage, 0),
+                    "buckets": {("+Inf" if bound == float("inf") else bound): n for bound, n in h.cumulative()}}
+            for stage, h in _stages.items()
+        }
+        peers = {}
+        for (direction, peer), (packets, nbytes) in _peers.items():
+            peers.setdefault(peer, {})[direction] = {"packets": packets, "bytes": nbytes}
+    return {"time": time.time(), "stages": stages, "peers": peers}
+
+
+def reset():
+    """Forget every observation"""
+    with _lock:
+        for stage in list(_stages):
+            _stages[stage] = Histogram()
+            _failures[stage] = 0
+        _peers.clear()
+
+
+# ===================== PROMETHEUS =====================
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render():
+    """All metrics in the Prometheus text exposition format"""
+    data = snapshot()
+    lines = ["# HELP stegovert_stage_seconds Duration of each pipeline stage",
+             "# TYPE stegovert_stage_seconds histogram"]
+    for stage, h in data["stages"].items():
+        for bound, count in h["buckets"].items():
+            lines.append(f'stegovert_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+        lines.append(f'stegovert_stage_seconds_sum{{stage="{stage}"}} {h["sum"]:.6f}')
+        lines.append(f'stegovert_stage_seconds_count{{stage="{stage}"}} {h["count"]}')
+    lines += ["# HELP stegovert_stage_failures_total Stage runs that raised",
+              "# TYPE stegovert_stage_failures_total counter"]
+    lines += [f'stegovert_stage_failures_total{{stage="{stage}"}} {h["failures"]}'
+              for stage, h in data["stages"].items()]
+    for unit in ("packets", "bytes"):
+        lines += [f"# HELP stegovert_peer_{unit}_total {unit.capitalize()} exchanged per peer",
+                  f"# TYPE stegovert_peer_{unit}_total counter"]
+        for peer, directions in data["peers"].items():
+            for direction, totals in directions.items():
+                lines.append(f'stegovert_peer_{unit}_total{{peer="{_label(peer)}",direction="{direction}"}} '
+                             f'{totals[unit]}')
+    return "\n".join(lines) + "\n"
+
+
+def _handler_class():
+    """Request handler, built on first use so http.server is not imported at start-up"""
+    from http.server import BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = render().encode(), "text/plain; version=0.0.4; charset=utf-8"
+            elif self.path == "/metrics.json":
+                body, content_type = json.dumps(snapshot()).encode(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass  # Scrapes every few seconds would flood the logs
+
+    return Handler
+
+
+def start_http_server(port=None, bind=None):
+    """Serve /metrics (Prometheus) and /metrics.json from a daemon thread.
+
+    Defaults to SETTINGS["port"] / SETTINGS["bind"]. Returns the server (call shutdown()
+    to stop it), or None when no port is configured. Raises OSError if the port is taken.
+    """
+    port = SETTINGS["port"] if port is None else port
+    if port is None:
+        return None
+    from http.server import ThreadingHTTPServer
+    server = ThreadingHTTPServer((bind or SETTINGS["bind"], port), _handler_class())
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="stegovert-metrics")
+    thread.daemon = True
+    thread.start()
+    return server
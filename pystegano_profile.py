@@ -0,0 +1,128 @@
+"""
+STEGOVERT - Profiler
+Profiling CPU opsional (cProfile) untuk operasi berat; aktif lewat STEGOVERT_PROFILE=1, --profile atau config.
+"""
+
+import cProfile
+import functools
+import inspect
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+
+from pystegano_config import DEFAULT_CONFIG
+
+ENV_VAR = "STEGOVERT_PROFILE"
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+
+# Tunables from the "profile" section of the config file; STEGOVERT_PROFILE=1 always enables it
+SETTINGS = dict(DEFAULT_CONFIG["profile"])
+
+log = logging.getLogger("stegovert.profile")
+_active = set()  # Threads with a profiler running; cProfile allows one per thread
+
+
+def configure(options):
+    """Apply profile settings (see pystegano_config.DEFAULT_CONFIG["profile"])"""
+    SETTINGS.update(options)
+
+
+def enabled():
+    return SETTINGS["enabled"] or os.environ.get(ENV_VAR, "").lower() not in ("", "0", "false", "no")
+
+
+class StartupTimer:
+    """Milestones since process start (perf_counter taken before the heavy imports)"""
+    def __init__(self, started):
+        self.started = started
+        self.marks = []  # (name, seconds since started)
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter() - self.started))
+
+    def report(self):
+        """One line with the time each milestone added, e.g. "imports 180 ms, window 95 ms, ..." """
+        parts, previous = [], 0.0
+        for name, at in self.marks:
+            parts.append(f"{name} {(at - previous) * 1000:.0f} ms")
+            previous = at
+        return ", ".join(parts) + f" (total {previous * 1000:.0f} ms)"
+
+
+def summary(profiler, top=None):
+    """Top functions by own time, one line each"""
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    stats.sort_stats("tottime")
+    lines = []
+    for func in stats.fcn_list[:top or SETTINGS["top"]]:
+        _, calls, own, cumulative, _ = stats.stats[func]
+        filename, line, name = func
+        where = f"{os.path.basename(filename)}:{line}({name})" if line else name
+        lines.append(f"{own * 1000:9.1f} ms self {cumulative * 1000:9.1f} ms cum {calls:>8}x  {where}")
+    return lines
+
+
+def _save(name, profiler, report):
+    directory = SETTINGS["dir"] or PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S") + f"-{int(time.time() * 1000) % 1000:03d}"
+    path = os.path.join(directory, f"{name}-{stamp}.prof")
+    profiler.dump_stats(path)
+    report(f"[~] Profile {name}: {path}")
+    for line in summary(profiler):
+        report(f"    {line}")
+    return path
+
+
+def wrap(name, func, report=None):
+    """func with every call profiled, or func itself when profiling is off.
+
+    Works for plain and coroutine functions. Each call is saved as
+    <dir>/<name>-<timestamp>.prof (open with snakeviz or pstats) and a top-N summary
+    goes to report(line) (default: the "stegovert.profile" logger). A profiled coroutine
+    also records the other tasks its event loop runs while it is suspended.
+    """
+    if not enabled():
+        return func
+    report = report or log.info
+
+    def start():
+        thread = threading.get_ident()
+        if thread in _active:
+            return None  # Already profiling this thread (nested or overlapping operation)
+        _active.add(thread)
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def stop(profiler):
+        profiler.disable()
+        _active.discard(threading.get_ident())
+        try:
+            _save(name, profiler, report)
+        except OSError as e:
+            report(f"[!] Cannot save profile {name}: {e}")
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def profiled_coroutine(*args, **kwargs):
+            profiler = start()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                if profiler:
+                    stop(profiler)
+        return profiled_coroutine
+
+    @functools.wraps(func)
+    def profiled(*args, **kwargs):
+        profiler = start()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if profiler:
+                stop(profiler)
+    return profiled
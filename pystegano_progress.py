@@ -0,0 +1,106 @@
+"""
+STEGOVERT - Progress Bus
+Menggabungkan laporan progres, status dan callback dari thread pekerja lalu menyerahkannya ke thread UI dengan laju maksimum tetap.
+"""
+
+import threading
+import time
+
+
+def _running(handle):
+    """True while a watched thread or future has not finished"""
+    return handle.is_alive() if hasattr(handle, "is_alive") else not handle.done()
+
+
+class ProgressBus:
+    """Hands progress, status and callbacks from any thread to the Tk thread, which
+    drains them at most max_rate times per second.
+
+    Workers never call Tk themselves. post(channel, **fields) merges fields into the
+    channel's pending values, so only the latest reach the handler registered with
+    subscribe(channel, handler), called as handler(**fields); call(func, *args) queues
+    a callback. Both only take a lock.
+
+    The Tk thread drains with after(): straight away for posts made on the Tk thread,
+    and otherwise on a drain loop that runs while a worker watched with watch(thread or
+    future) is alive. The loop backs off to idle_interval while nothing arrives and
+    stops once every watched worker has finished, so an idle window has no timer.
+    """
+    def __init__(self, widget, max_rate=20, idle_interval=0.25):
+        self.widget = widget
+        self.interval = 1.0 / max_rate
+        self.idle_interval = max(idle_interval, self.interval)
+        self._handlers = {}
+        self._pending = {}
+        self._calls = []
+        self._watched = []
+        self._lock = threading.Lock()
+        self._ui_thread = threading.current_thread()
+        self._job = None  # after() id of the next drain, None while asleep
+        self._delay = self.interval
+        self._last_flush = 0.0
+
+    def subscribe(self, channel, handler):
+        """Register the UI-thread handler for a channel (replaces any previous one)"""
+        self._handlers[channel] = handler
+
+    def unsubscribe(self, channel):
+        self._handlers.pop(channel, None)
+        with self._lock:
+            self._pending.pop(channel, None)
+
+    def post(self, channel, **fields):
+        """Record the latest fields for a channel; cheap enough to call per chunk"""
+        with self._lock:
+            self._pending.setdefault(channel, {}).update(fields)
+        self._wake()
+
+    def call(self, func, *args):
+        """Run func(*args) on the Tk thread, in order with the other calls"""
+        with self._lock:
+            self._calls.append((func, args))
+        self._wake()
+
+    def watch(self, handle):
+        """Tk thread: keep draining until handle (a thread or future) finishes"""
+        self._watched.append(handle)
+        self._wake()
+
+    def _wake(self):
+        if threading.current_thread() is not self._ui_thread:
+            return  # The drain loop of the watched worker picks it up
+        if self._job is not None:
+            if self._delay <= self.interval:
+                return
+            self.widget.after_cancel(self._job)  # Backed-off drain: bring it forward
+        self._delay = self.interval
+        delay = max(0.0, self._last_flush + self.interval - time.monotonic())
+        self._job = self.widget.after(int(delay * 1000), self._flush)
+
+    def _flush(self):
+        self._job = None
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            calls, self._calls = self._calls, []
+            self._last_flush = time.monotonic()
+        try:
+            for channel, fields in pending.items():
+                handler = self._handlers.get(channel)
+                if handler:
+                    handler(**fields)
+            for func, args in calls:
+                func(*args)
+        finally:
+            self._reschedule(pending or calls)
+
+    def _reschedule(self, delivered):
+        # Watched workers first: one that finished after this check posts before the check below
+        self._watched = [handle for handle in self._watched if _running(handle)]
+        with self._lock:
+            more = bool(self._pending or self._calls)
+        if delivered or more:
+            self._delay = self.interval
+        else:
+            self._delay = min(self._delay * 2, self.idle_interval)
+        if (more or self._watched) and self._job is None:  # A modal dialog in a call may have woken it already
+            self._job = self.widget.after(int(self._delay * 1000), self._flush)
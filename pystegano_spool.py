@@ -0,0 +1,128 @@
+"""
+STEGOVERT - Spool
+Antrean paket yang diterima: setiap paket langsung dibaca (dan didekripsi) oleh pool proses di latar belakang.
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import os
+import time
+
+import pystegano_metrics as metrics
+import pystegano_trace as trace
+from pystegano_config import DEFAULT_CONFIG
+
+RESULT_SUFFIX = ".json"
+PACKET_EXTENSIONS = (".png", ".bmp", ".tif", ".tiff")
+
+# Tunables from the "spool" section of the config file
+SETTINGS = dict(DEFAULT_CONFIG["spool"])
+
+
+def configure(options):
+    """Apply spool settings (see pystegano_config.DEFAULT_CONFIG["spool"])"""
+    SETTINGS.update(options)
+
+
+def result_path(packet_path):
+    """Where the reveal result of a packet is stored (next to it)"""
+    return packet_path + RESULT_SUFFIX
+
+
+def load_result(packet_path):
+    """Stored reveal result of a packet, or None if it has not been processed yet"""
+    try:
+        with open(result_path(packet_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def reveal_to_file(packet_path, passwords, info):
+    """Worker process: reveal one packet and write its result JSON beside it"""
+    from pystegano_core import reveal_payload  # stegano is only loaded in the workers
+
+    started = time.perf_counter()
+    result = dict(info, packet=os.path.basename(packet_path), revealed=False, error=None, timings={})
+    try:
+        result.update(reveal_payload(packet_path, passwords, result["timings"]), revealed=True)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["reveal_seconds"] = round(time.perf_counter() - started, 4)
+
+    temp_path = result_path(packet_path) + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, result_path(packet_path))
+    return result
+
+
+def _observe_timings(future):
+    """Worker processes have their own metrics and trace settings, so their stage timings
+    are replayed here and the "reveal" trace record is written by this process"""
+    if future.cancelled() or future.exception() is not None:
+        return
+    result = future.result()
+    timings = result.get("timings", {})
+    for stage, seconds in timings.items():
+        metrics.observe(stage, seconds)
+    payload = result.get("payload")
+    trace.emit({"event": "reveal", "id": trace.new_id(), "ts": time.time(), "sha256": result.get("sha256"),
+                "packet": result["packet"], "peer": result.get("peer"), "phases": timings,
+                "duration": result["reveal_seconds"], "outcome": "error" if result["error"] else "ok",
+                "error": result["error"], "encrypted": result.get("encrypted"), "decrypted": result.get("decrypted"),
+                "payload_length": len(payload) if payload is not None else None, "worker": True})
+
+
+class Spool:
+    """Reveals received packets in a process pool as soon as they land"""
+    def __init__(self, directory, passwords=None, workers=None, catalog=None):
+        self.directory = directory
+        self.passwords = list(SETTINGS["passwords"] if passwords is None else passwords)
+        self.catalog = catalog  # pystegano_store.Catalog that records each reveal status
+        self._running = set()
+        self.pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers or SETTINGS["workers"])
+
+    def submit(self, packet_path, **info):
+        """Queue a packet for reveal from the event loop; info (peer, sha256...) is stored with
+        the result. Returns an asyncio future of the result dict. A packet that was already
+        revealed (the same content received again) resolves at once with its stored result."""
+        loop = asyncio.get_running_loop()
+        existing = load_result(packet_path)
+        if existing is not None:
+            future = loop.create_future()
+            future.set_result(existing)
+            return future
+        info.setdefault("received_at", time.strftime("%Y-%m-%dT%H:%M:%S%z"))
+        future = loop.run_in_executor(self.pool, reveal_to_file, packet_path, self.passwords, info)
+        future.add_done_callback(_observe_timings)
+        if self.catalog and info.get("sha256"):
+            future.add_done_callback(lambda f: self._record(info["sha256"], f))
+        self._running.add(future)
+        future.add_done_callback(self._running.discard)
+        return future
+
+    def _record(self, digest, future):
+        if not future.cancelled() and future.exception() is None:
+            self.catalog.update_reveal(digest, future.result())
+
+    def pending(self):
+        """Packets that have no result yet (e.g. after a restart), as (path, sha256 or None)"""
+        if self.catalog:
+            return [(row["path"], row["sha256"]) for row in self.catalog.packets("pending")
+                    if not os.path.exists(result_path(row["path"]))]
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            (os.path.join(self.directory, name), None) for name in os.listdir(self.directory)
+            if name.lower().endswith(PACKET_EXTENSIONS)
+            and not os.path.exists(os.path.join(self.directory, name + RESULT_SUFFIX)))
+
+    async def drain(self):
+        """Wait for every queued reveal (and its catalog update) to finish"""
+        if self._running:
+            await asyncio.wait(set(self._running))
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
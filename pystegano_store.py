@@ -0,0 +1,166 @@
+"""
+STEGOVERT - Packet Store
+Penyimpanan paket berdasarkan hash isi (duplikat otomatis hilang) dengan katalog SQLite yang terindeks.
+"""
+
+import argparse
+import datetime
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS packets (
+    sha256          TEXT PRIMARY KEY,
+    size            INTEGER NOT NULL,
+    path            TEXT NOT NULL,
+    first_seen      REAL NOT NULL,
+    reveal_status   TEXT NOT NULL DEFAULT 'pending',  -- pending / revealed / encrypted / failed
+    encrypted       INTEGER,
+    decrypted       INTEGER,
+    payload_length  INTEGER,
+    reveal_seconds  REAL
+);
+CREATE TABLE IF NOT EXISTS receipts (
+    id           INTEGER PRIMARY KEY,
+    sha256       TEXT NOT NULL REFERENCES packets(sha256),
+    peer         TEXT,
+    filename     TEXT,
+    received_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS receipts_peer_time ON receipts(peer, received_at);
+CREATE INDEX IF NOT EXISTS receipts_time ON receipts(received_at);
+CREATE INDEX IF NOT EXISTS receipts_sha256 ON receipts(sha256);
+CREATE INDEX IF NOT EXISTS packets_status ON packets(reveal_status);
+"""
+
+
+class Catalog:
+    """SQLite index of stored packets and every time one was received"""
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")  # Readers never block the receiver
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def record(self, sha256, size, path, peer=None, filename=None, received_at=None):
+        """Add a receipt, creating the packet row on first sight. Returns True for a new packet"""
+        received_at = received_at or time.time()
+        with self._lock, self._db:
+            new = self._db.execute(
+                "INSERT OR IGNORE INTO packets (sha256, size, path, first_seen) VALUES (?, ?, ?, ?)",
+                (sha256, size, path, received_at)).rowcount == 1
+            self._db.execute("INSERT INTO receipts (sha256, peer, filename, received_at) VALUES (?, ?, ?, ?)",
+                             (sha256, peer, filename, received_at))
+        return new
+
+    def update_reveal(self, sha256, result):
+        """Store the payload metadata of a spool reveal result"""
+        if result.get("error"):
+            status = "failed"
+        elif result["encrypted"] and not result["decrypted"]:
+            status = "encrypted"
+        else:
+            status = "revealed"
+        payload = result.get("payload")
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE packets SET reveal_status = ?, encrypted = ?, decrypted = ?, payload_length = ?,"
+                " reveal_seconds = ? WHERE sha256 = ?",
+                (status, result.get("encrypted"), result.get("decrypted"),
+                 len(payload) if payload is not None else None, result.get("reveal_seconds"), sha256))
+
+    def packet(self, sha256):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM packets WHERE sha256 = ?", (sha256,)).fetchone()
+        return dict(row) if row else None
+
+    def packets(self, status):
+        """Packets with a given reveal status, oldest first"""
+        with self._lock:
+            return [dict(row) for row in self._db.execute(
+                "SELECT * FROM packets WHERE reveal_status = ? ORDER BY first_seen", (status,))]
+
+    def receipts(self, peer=None, since=None, until=None, status=None, limit=None):
+        """Receipts joined with their packet, newest first, filtered on the indexed columns"""
+        query = "SELECT r.*, p.size, p.path, p.reveal_status FROM receipts r JOIN packets p USING (sha256)"
+        conditions, params = [], []
+        for clause, value in (("r.peer = ?", peer), ("r.received_at >= ?", since),
+                              ("r.received_at < ?", until), ("p.reveal_status = ?", status)):
+            if value is not None:
+                conditions.append(clause)
+                params.append(value)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY r.received_at DESC"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        with self._lock:
+            return [dict(row) for row in self._db.execute(query, params)]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class PacketStore:
+    """Packets filed under their SHA-256 (store/ab/abcdef....png) plus the catalog"""
+    def __init__(self, root):
+        self.root = root
+        self.objects_dir = os.path.join(root, "store")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.catalog = Catalog(os.path.join(root, "catalog.sqlite3"))
+
+    def object_path(self, sha256, filename):
+        ext = os.path.splitext(filename)[1].lower() or ".bin"
+        return os.path.join(self.objects_dir, sha256[:2], sha256 + ext)
+
+    def add(self, path, sha256, filename, peer=None):
+        """Move a verified file into the store (dropping it if the content is already there)
+        and record the receipt. Returns the stored path"""
+        target = self.object_path(sha256, filename)
+        size = os.path.getsize(path)
+        if os.path.exists(target):
+            os.remove(path)  # Duplicate content
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(path, target)
+        self.catalog.record(sha256, size, target, peer, filename)
+        return target
+
+    def close(self):
+        self.catalog.close()
+
+
+# ===================== CLI =====================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cari paket di katalog STEGOVERT")
+    parser.add_argument("root", nargs="?", help="Folder receiver (default: received/ di folder aplikasi)")
+    parser.add_argument("--peer", help="Hanya paket dari alamat ini")
+    parser.add_argument("--today", action="store_true", help="Hanya paket hari ini")
+    parser.add_argument("--status", choices=["pending", "revealed", "encrypted", "failed"])
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    from pystegano_transport import RECEIVED_DIR
+    store = PacketStore(args.root or RECEIVED_DIR)
+    since = None
+    if args.today:
+        since = datetime.datetime.combine(datetime.date.today(), datetime.time()).timestamp()
+    started = time.perf_counter()
+    rows = store.catalog.receipts(args.peer, since, status=args.status, limit=args.limit)
+    elapsed = time.perf_counter() - started
+    for row in rows:
+        when = datetime.datetime.fromtimestamp(row["received_at"]).strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{when}  {row['peer'] or '-':15}  {row['sha256'][:16]}  {row['size']:>10}  "
+              f"{row['reveal_status']:9}  {row['filename']}")
+    print(f"{len(rows)} paket ({elapsed * 1000:.1f} ms)")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+STEGOVERT - Trace
+Catatan terstruktur (JSONL) per encode, kirim, terima dan reveal: ID transfer, durasi tiap fase, ukuran dan hasil.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import json
+import threading
+import time
+import uuid
+
+import pystegano_metrics as metrics
+from pystegano_config import DEFAULT_CONFIG
+
+# Tunables from the "trace" section of the config file
+SETTINGS = dict(DEFAULT_CONFIG["trace"])
+
+_current = contextvars.ContextVar("stegovert_trace", default=None)
+_lock = threading.Lock()
+_sink = {"path": None, "file": None}
+
+
+def configure(options):
+    """Apply trace settings (see pystegano_config.DEFAULT_CONFIG["trace"])"""
+    SETTINGS.update(options)
+
+
+def enabled():
+    return bool(SETTINGS["file"])
+
+
+def new_id():
+    """A fresh transfer/record ID, the same format as the transfer IDs on the wire"""
+    return uuid.uuid4().hex[:16]
+
+
+def emit(record):
+    """Append one record to the trace file (a no-op while tracing is off). Thread-safe."""
+    if not enabled():
+        return
+    line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    with _lock:
+        if _sink["path"] != SETTINGS["file"]:
+            if _sink["file"]:
+                _sink["file"].close()
+            _sink.update(path=SETTINGS["file"], file=open(SETTINGS["file"], "a", encoding="utf-8"))
+        _sink["file"].write(line)
+        _sink["file"].flush()
+
+
+class Trace:
+    """One traced operation. Used as a context manager it becomes the current trace of
+    the thread or asyncio task (and of tasks it starts): metrics stages timed inside it
+    become its phases. The record is written on exit with outcome "ok" or "error".
+
+    Records are flat JSON objects: ts, event, id, duration, outcome, error, phases
+    ({name: seconds}, repeated phases add up) and any fields passed or set later.
+    Sender and receiver records of a transfer share its id; every record that has a
+    packet carries its sha256, which joins encode, send, receive and reveal.
+    """
+    def __init__(self, event, transfer_id=None, **fields):
+        self.record = dict(fields, event=event, id=transfer_id or new_id(), phases={})
+        self._token = None
+        self._started = None
+
+    @property
+    def id(self):
+        return self.record["id"]
+
+    def __enter__(self):
+        self.record["ts"] = time.time()
+        self._started = time.perf_counter()
+        if enabled():
+            self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._token is not None:
+            _current.reset(self._token)
+        if exc_type is not None and "outcome" not in self.record:
+            cancelled = issubclass(exc_type, (asyncio.CancelledError, KeyboardInterrupt))
+            self.record.update(outcome="cancelled" if cancelled else "error", error=f"{exc_type.__name__}: {exc}")
+        self.finish()
+        return False
+
+    def add_phase(self, name, seconds):
+        phases = self.record["phases"]
+        phases[name] = phases.get(name, 0.0) + seconds
+
+    def count(self, **counters):
+        for key, value in counters.items():
+            self.record[key] = self.record.get(key, 0) + value
+
+    def update(self, **fields):
+        self.record.update(fields)
+
+    def finish(self):
+        self.record.setdefault("outcome", "ok")
+        self.record.setdefault("error", None)
+        self.record["duration"] = time.perf_counter() - self._started
+        emit(self.record)
+
+
+def current():
+    """The active trace of this thread/task, or None"""
+    return _current.get()
+
+
+@contextlib.contextmanager
+def phase(name):
+    """Time a block as a phase of the current trace only (no metrics stage)"""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_phase(name, time.perf_counter() - started)
+
+
+def count(**counters):
+    """Add to counters (chunks=1, retries=1...) of the current trace"""
+    trace = _current.get()
+    if trace is not None:
+        trace.count(**counters)
+
+
+def update(**fields):
+    """Set fields of the current trace"""
+    trace = _current.get()
+    if trace is not None:
+        trace.update(**fields)
+
+
+def _on_stage(stage, seconds):
+    trace = _current.get()
+    if trace is not None:
+        trace.add_phase(stage, seconds)
+
+
+metrics.add_observer(_on_stage)
@@ -0,0 +1,1099 @@
+"""
+STEGOVERT - Transport
+Inti jaringan asyncio yang dipakai bersama oleh CLI (pystegano.py) dan GUI (pystegano_gui.py).
+"""
+
+import asyncio
+import functools
+import hashlib
+import itertools
+import math
+import mmap
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+
+import pystegano_metrics as metrics
+import pystegano_trace as trace
+from pystegano_config import DEFAULT_CONFIG
+
+# ===================== KONFIGURASI =====================
+SEPARATOR = "<SEPARATOR>"
+HEADER_LIMIT = 4096
+SENDFILE_SLICE = 1024 * 1024  # Zero-copy slice between progress reports
+ADAPT_WINDOW = 0.05  # Seconds of I/O measured before each chunk size decision
+MIN_RANGE_SIZE = 1024 * 1024  # Smallest byte range worth its own stream
+RTT_PER_STREAM = 0.010  # Latency covered by each extra parallel stream in "auto" mode
+CHECKPOINT_INTERVAL = 1.0  # Seconds between flushed resume offsets of a partial file
+DIGEST_CACHE_SIZE = 64  # Files whose hash is kept (the receiver hashes every assembled packet)
+DEFAULT_PORT = 5001
+PROTOCOL_VERSION = 1
+CONNECT_TIMEOUT = 10
+IO_TIMEOUT = 30
+RECEIVED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "received")
+
+# Tunables from the "transport" section of the config file
+SETTINGS = dict(DEFAULT_CONFIG["transport"])
+
+
+def configure(options):
+    """Apply transport settings (see pystegano_config.DEFAULT_CONFIG["transport"])"""
+    SETTINGS.update(options)
+
+
+def apply_socket_options(sock):
+    """Apply configured SO_SNDBUF/SO_RCVBUF to a socket"""
+    if SETTINGS["sndbuf"]:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, int(SETTINGS["sndbuf"]))
+    if SETTINGS["rcvbuf"]:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, int(SETTINGS["rcvbuf"]))
+
+
+class ChunkSizer:
+    """Chunk size that doubles while measured throughput keeps improving"""
+    def __init__(self):
+        self.size = int(SETTINGS["chunk_size"])
+        self.max_size = max(self.size, int(SETTINGS["max_chunk_size"]))
+        self.adaptive = bool(SETTINGS["adaptive_chunk"])
+        self._best_rate = 0.0
+        self._bytes = 0
+        self._elapsed = 0.0
+
+    def record(self, nbytes, elapsed):
+        """Feed one chunk's byte count and duration"""
+        if not self.adaptive:
+            return
+        self._bytes += nbytes
+        self._elapsed += elapsed
+        if self._elapsed < ADAPT_WINDOW:
+            return
+        rate = self._bytes / self._elapsed
+        self._bytes, self._elapsed = 0, 0.0
+        if rate > self._best_rate * 1.1 and self.size < self.max_size:
+            self._best_rate = rate
+            self.size = min(self.size * 2, self.max_size)
+        else:
+            self.adaptive = False  # Plateau reached, keep the current size
+
+
+class TransferError(Exception):
+    """Raised when the peer breaks the transfer protocol"""
+
+
+class TransferRejected(TransferError):
+    """Raised when the receiver answers ERR; retrying would be rejected again"""
+
+
+# ===================== CONNECTION =====================
+class Connection:
+    """Non-blocking TCP socket driven by the running event loop"""
+    def __init__(self, sock, peer):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Small frames go out at once
+        sock.setblocking(False)
+        self.sock = sock
+        self.peer = peer
+        self.loop = asyncio.get_running_loop()
+        self._pending = bytearray()
+
+    @classmethod
+    async def open(cls, host, port, timeout=CONNECT_TIMEOUT):
+        """Connect to host:port (Layer 4 TCP)"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        apply_socket_options(sock)
+        sock.setblocking(False)
+        try:
+            await asyncio.wait_for(asyncio.get_running_loop().sock_connect(sock, (host, port)), timeout)
+        except BaseException:
+            sock.close()
+            raise
+        return cls(sock, host)
+
+    async def read_line(self, timeout=IO_TIMEOUT):
+        """Read one newline-terminated frame, or "" if the peer closed without sending one"""
+        while b"\n" not in self._pending:
+            if len(self._pending) > HEADER_LIMIT:
+                raise TransferError("Header frame too long")
+            data = await asyncio.wait_for(self.loop.sock_recv(self.sock, HEADER_LIMIT), timeout)
+            if not data and not self._pending:
+                return ""
+            if not data:
+                raise TransferError("Connection closed mid-frame")
+            self._pending += data
+        line, _, rest = self._pending.partition(b"\n")
+        self._pending = bytearray(rest)
+        return line.decode()
+
+    async def read(self, size, timeout=IO_TIMEOUT):
+        """Read up to size bytes, returning b'' once the peer closes"""
+        if self._pending:
+            data = bytes(self._pending[:size])
+            del self._pending[:size]
+            return data
+        return await asyncio.wait_for(self.loop.sock_recv(self.sock, size), timeout)
+
+    async def read_into(self, view, timeout=IO_TIMEOUT):
+        """Receive directly into a writable memoryview, returning the byte count (0 once closed)"""
+        if self._pending:
+            n = min(len(view), len(self._pending))
+            view[:n] = self._pending[:n]
+            del self._pending[:n]
+            return n
+        return await asyncio.wait_for(self.loop.sock_recv_into(self.sock, view), timeout)
+
+    async def write(self, data, timeout=IO_TIMEOUT):
+        """Send all bytes of data"""
+        await asyncio.wait_for(self.loop.sock_sendall(self.sock, data), timeout)
+
+    async def write_file(self, f, offset, count, on_chunk=None, timeout=IO_TIMEOUT, digest=None):
+        """Send count bytes of an open file starting at offset.
+
+        Uses kernel zero-copy (os.sendfile / TransmitFile) when the loop supports it,
+        otherwise a double-buffered read-ahead loop. on_chunk(nbytes) reports progress.
+        The buffered loop also feeds every chunk it sends to digest (a hashlib object).
+        Returns True if it did, False for a zero-copy send that never passed through Python.
+        """
+        if not count:
+            return digest is not None
+        try:
+            await self._write_file_zero_copy(f, offset, count, on_chunk, timeout)
+            return False
+        except asyncio.SendfileNotAvailableError:
+            await self._write_file_buffered(f, offset, count, on_chunk, timeout, digest)
+            return digest is not None
+
+    async def _write_file_zero_copy(self, f, offset, count, on_chunk, timeout):
+        end = offset + count
+        while offset < end:
+            size = min(SENDFILE_SLICE, end - offset)
+            sent = await asyncio.wait_for(
+                self.loop.sock_sendfile(self.sock, f, offset, size, fallback=False), timeout)
+            if not sent:
+                raise TransferError("File shrank during transfer")
+            offset += sent
+            if on_chunk:
+                on_chunk(sent)
+
+    async def _write_file_buffered(self, f, offset, count, on_chunk, timeout, digest=None):
+        # Read (and hash) the next chunk in a worker thread while the current one is on the wire
+        def read_at(position, size):
+            f.seek(position)
+            chunk = f.read(size)
+            if digest:
+                digest.update(chunk)
+            return chunk
+
+        sizer = ChunkSizer()
+        end = offset + count
+        pending = self.loop.run_in_executor(None, read_at, offset, min(sizer.size, count))
+        while pending:
+            chunk = await pending
+            if not chunk:
+                raise TransferError("File shrank during transfer")
+            offset += len(chunk)
+            pending = None
+            if offset < end:
+                pending = self.loop.run_in_executor(None, read_at, offset, min(sizer.size, end - offset))
+            started = time.perf_counter()
+            await self.write(chunk, timeout)
+            sizer.record(len(chunk), time.perf_counter() - started)
+            if on_chunk:
+                on_chunk(len(chunk))
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+# ===================== PROTOCOL =====================
+# Sender -> "NamaFile<SEPARATOR>Ukuran<SEPARATOR>id=...<SEPARATOR>sha256=...\n"
+# Receiver -> "OFFSET<SEPARATOR>n\n", sender streams bytes [n, Ukuran)
+# Sender -> trailer "SHA256<SEPARATOR>digest\n"
+# Multi-stream transfers add "range=start-end" and "streams=n" fields, one connection per range
+# Receiver -> "OK\n" or "ERR<SEPARATOR>reason\n" after checking its streaming hash
+# "kind=delta" packets are rebuilt from a cached carrier, "kind=carrier" adds one to the cache
+# Carrier probe: sender -> "HAVE<SEPARATOR>carrier_hash\n", receiver -> "YES\n" or "NO\n"
+# Liveness probe: "HELLO\n" -> "STEGOVERT<SEPARATOR>protocol_version\n"
+def file_sha256(path):
+    """SHA-256 hex digest of a file, cached per (path, size, mtime)"""
+    stat = os.stat(path)
+    return _cached_sha256(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=DIGEST_CACHE_SIZE)
+def _cached_sha256(path, size, mtime_ns):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def format_header(filename, filesize, **fields):
+    """Encode a header frame with optional key=value fields"""
+    parts = [filename, str(filesize)] + [f"{key}={value}" for key, value in fields.items()]
+    return (SEPARATOR.join(parts) + "\n").encode()
+
+
+def parse_header(line):
+    """Decode a header frame into (filename, filesize, fields)"""
+    filename, filesize, *extra = line.split(SEPARATOR)
+    fields = dict(item.split("=", 1) for item in extra)
+    return os.path.basename(filename), int(filesize), fields
+
+
+def parse_reply(line, expected):
+    """Split a receiver reply, raising TransferError on ERR"""
+    kind, _, value = line.partition(SEPARATOR)
+    if kind == "ERR":
+        raise TransferRejected(f"Receiver rejected transfer: {value}")
+    if kind != expected:
+        raise TransferError(f"Unexpected reply: {line!r}")
+    return value
+
+
+def _is_hex(value):
+    return bool(value) and len(value) <= 64 and all(c in "0123456789abcdef" for c in value)
+
+
+# ===================== SENDER =====================
+async def hello(host, port, timeout=CONNECT_TIMEOUT):
+    """Protocol version of the STEGOVERT receiver at host:port, or None if something else answers"""
+    conn = await Connection.open(host, port, timeout)
+    try:
+        await conn.write(b"HELLO\n")
+        magic, _, version = (await conn.read_line(timeout)).partition(SEPARATOR)
+        return int(version) if magic == "STEGOVERT" and version.isdigit() else None
+    except (TransferError, UnicodeDecodeError):
+        return None
+    finally:
+        conn.close()
+
+
+async def measure_rtt(host, port, timeout=CONNECT_TIMEOUT):
+    """Round-trip time of a TCP handshake with the receiver, in seconds"""
+    started = time.perf_counter()
+    conn = await Connection.open(host, port, timeout)
+    conn.close()
+    return time.perf_counter() - started
+
+
+async def auto_streams(host, port, filesize, timeout=CONNECT_TIMEOUT):
+    """Pick a stream count from the measured RTT: one stream per RTT_PER_STREAM of latency"""
+    if filesize < SETTINGS["parallel_min_size"]:
+        return 1
+    rtt = await measure_rtt(host, port, timeout)
+    return max(1, min(int(SETTINGS["max_streams"]), math.ceil(rtt / RTT_PER_STREAM)))
+
+
+async def send_file(host, port, path, on_progress=None, timeout=CONNECT_TIMEOUT, transfer_id=None,
+                    on_retry=None, streams=None, filename=None, kind=None):
+    """Send a file to a receiver. on_progress(bytes_sent, filesize) is called per chunk.
+
+    Once connected, a dropped transfer is retried up to SETTINGS["retries"] times and
+    resumes from the offset the receiver reports. on_retry(attempt, exc) is called first.
+    streams > 1 splits the file into byte ranges sent over parallel connections; "auto"
+    picks the count from the round-trip time (default: SETTINGS["streams"]).
+    filename overrides the announced name and kind is passed to the receiver as is.
+    Returns the number of bytes put on the wire.
+    """
+    loop = asyncio.get_running_loop()
+    transfer_id = transfer_id or uuid.uuid4().hex[:16]
+    digest = await loop.run_in_executor(None, file_sha256, path)
+    filesize = os.path.getsize(path)
+    name = filename or os.path.basename(path)
+    fields = {"id": transfer_id, "sha256": digest}
+    if kind:
+        fields["kind"] = kind
+
+    streams = streams or SETTINGS["streams"]
+    if str(streams).strip().lower() == "auto":  # Any casing, from the GUI, the CLI or the config file
+        streams = await auto_streams(host, port, filesize, timeout)
+    streams = max(1, min(int(streams), filesize // MIN_RANGE_SIZE))
+    trace.update(streams=streams)
+
+    bounds = [filesize * i // streams for i in range(streams + 1)]
+    sent = [0] * streams
+
+    def on_position(index, position):
+        sent[index] = position - bounds[index]
+        if on_progress:
+            on_progress(sum(sent), filesize)
+
+    jobs = [
+        loop.create_task(_send_range(host, port, path, name, fields, bounds[i], bounds[i + 1],
+                                     streams, timeout, on_retry,
+                                     lambda position, i=i: on_position(i, position)))
+        for i in range(streams)
+    ]
+    try:
+        with metrics.timed("transmit"):
+            return sum(await asyncio.gather(*jobs))
+    finally:
+        for job in jobs:
+            job.cancel()
+
+
+async def _send_range(host, port, path, name, fields, start, end, streams, timeout, on_retry,
+                      on_position):
+    """Send bytes [start, end) over one connection, reconnecting and resuming on failure"""
+    bytes_sent = 0
+    attempt = 0
+    connected = False
+
+    def on_chunk(nbytes):
+        nonlocal bytes_sent
+        bytes_sent += nbytes
+        trace.count(chunks=1)
+
+    while True:
+        conn = None
+        try:
+            with metrics.timed("connect"):
+                conn = await Connection.open(host, port, timeout)
+            connected = True
+            await _send_over(conn, path, name, fields, start, end, streams, on_chunk, on_position)
+            return bytes_sent
+        except (OSError, asyncio.TimeoutError, TransferError) as e:
+            # Never reached the receiver, or refused by it: report at once instead of retrying
+            if not connected or isinstance(e, TransferRejected) or attempt >= SETTINGS["retries"]:
+                raise
+            attempt += 1
+            trace.count(retries=1)
+            if on_retry:
+                on_retry(attempt, e)
+        finally:
+            if conn:
+                conn.close()
+        await asyncio.sleep(SETTINGS["retry_delay"] * 2 ** (attempt - 1))
+
+
+async def _send_over(conn, path, name, fields, start, end, streams, on_chunk, on_position):
+    """Run one connection of a transfer, resuming at the receiver's offset"""
+    filesize = os.path.getsize(path)
+    fields = dict(fields)
+    if streams > 1:
+        fields.update(range=f"{start}-{end}", streams=streams)
+    await conn.write(format_header(name, filesize, **fields))
+    offset = int(parse_reply(await conn.read_line(), "OFFSET"))
+    if not start <= offset <= end:
+        raise TransferError(f"Invalid resume offset {offset}")
+
+    position = offset
+    on_position(position)
+
+    def chunk_sent(nbytes):
+        nonlocal position
+        position += nbytes
+        on_chunk(nbytes)
+        on_position(position)
+
+    # The header hash is computed up front (the receiver keys partial files and resume
+    # on it). A buffered send of the whole file hashes what it reads on the way and
+    # sends that in the trailer, so a packet that changed mid-send is caught; zero-copy
+    # sends and partial ranges never see every byte and repeat the announced hash.
+    sent_digest = hashlib.sha256() if (offset, end) == (0, filesize) else None
+    with open(path, "rb") as f:
+        hashed = await conn.write_file(f, offset, end - offset, chunk_sent, digest=sent_digest)
+    trailer = sent_digest.hexdigest() if hashed else fields["sha256"]
+    await conn.write(f"SHA256{SEPARATOR}{trailer}\n".encode())
+    parse_reply(await conn.read_line(), "OK")
+
+
+async def has_carrier(host, port, carrier_hash, timeout=CONNECT_TIMEOUT):
+    """Ask the receiver whether its carrier cache holds the image with this content hash"""
+    conn = await Connection.open(host, port, timeout)
+    try:
+        await conn.write(f"HAVE{SEPARATOR}{carrier_hash}\n".encode())
+        return await conn.read_line() == "YES"  # Older receivers just hang up
+    finally:
+        conn.close()
+
+
+class PacketPlan:
+    """Carrier hash, delta and carrier upload of one packet, computed once and shared
+    by every send of it"""
+    def __init__(self, packet_path, carrier_path=None):
+        self.packet_path = packet_path
+        self.carrier_path = carrier_path if SETTINGS["delta"] else None
+        self._scratch = tempfile.TemporaryDirectory(prefix="stegovert-")
+        self._results = {}
+        self._lock = None
+        if self.carrier_path:
+            try:
+                import pystegano_delta  # Pillow/numpy are only needed for delta transfers
+            except ImportError:
+                self.carrier_path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._scratch.cleanup()
+
+    async def _once(self, key, func, *args):
+        """Run func in the executor the first time key is asked for, then reuse its result"""
+        self._lock = self._lock or asyncio.Lock()
+        async with self._lock:
+            if key not in self._results:
+                self._results[key] = await asyncio.get_running_loop().run_in_executor(None, func, *args)
+        return self._results[key]
+
+    async def carrier_hash(self):
+        import pystegano_delta
+        return await self._once("carrier_hash", pystegano_delta.carrier_hash, self.carrier_path)
+
+    async def delta(self):
+        """Delta file path, or None when the packet is more than LSB changes of the carrier"""
+        import pystegano_delta
+        return await self._once("delta", pystegano_delta.make_delta, self.carrier_path, self.packet_path,
+                                os.path.join(self._scratch.name, "packet.delta"))
+
+    async def carrier_upload(self):
+        """Lossless PNG of the carrier for receivers that do not cache it yet"""
+        import pystegano_delta
+        digest = await self.carrier_hash()
+        return await self._once("carrier_upload", pystegano_delta.export_carrier, self.carrier_path,
+                                os.path.join(self._scratch.name, f"{digest}.png"))
+
+
+async def send_packet(host, port, packet_path, carrier_path=None, on_progress=None, timeout=CONNECT_TIMEOUT,
+                      on_retry=None, streams=None, on_stage=None, plan=None):
+    """Send an encoded packet, as an LSB delta against its carrier when the receiver caches it.
+
+    on_stage(stage, nbytes) is called before each upload with stage "delta", "full" or
+    "carrier". The whole packet is sent when there is no carrier, the receiver lacks it, or
+    the packet differs from it in more than the low bits; the carrier is then uploaded
+    (SETTINGS["upload_carriers"]) so the next packet on it can go as a delta.
+    plan shares that preparation between several sends of the same packet.
+    Each send writes a "send" trace record whose id the receiver's records share.
+    Returns the number of bytes put on the wire.
+    """
+    if plan is None:
+        with PacketPlan(packet_path, carrier_path) as plan:
+            return await send_packet(host, port, packet_path, carrier_path, on_progress, timeout,
+                                     on_retry, streams, on_stage, plan)
+
+    def stage(name, path):
+        if on_stage:
+            on_stage(name, os.path.getsize(path))
+
+    digest = await asyncio.get_running_loop().run_in_executor(None, file_sha256, packet_path)
+    with trace.Trace("send", peer=f"{host}:{port}", sha256=digest, size=os.path.getsize(packet_path)) as record:
+        cached = False
+        if plan.carrier_path:
+            with trace.phase("probe"):
+                cached = await has_carrier(host, port, await plan.carrier_hash(), timeout)
+        if cached:
+            with trace.phase("delta_build"):
+                delta_path = await plan.delta()
+            if delta_path:
+                stage("delta", delta_path)
+                try:
+                    sent = await send_file(host, port, delta_path, on_progress, timeout, record.id, on_retry,
+                                           streams=1, filename=os.path.basename(packet_path), kind="delta")
+                    metrics.record_transfer("sent", host, sent)
+                    record.update(mode="delta", wire_bytes=sent)
+                    return sent
+                except TransferRejected:
+                    pass  # Carrier evicted or rebuild failed on the receiver: send it whole
+
+        stage("full", packet_path)
+        sent = await send_file(host, port, packet_path, on_progress, timeout, record.id, on_retry, streams=streams)
+        metrics.record_transfer("sent", host, sent)
+        record.update(mode="full", wire_bytes=sent)
+        if plan.carrier_path and not cached and SETTINGS["upload_carriers"]:
+            upload = await plan.carrier_upload()
+            stage("carrier", upload)
+            try:
+                with trace.phase("carrier_upload"):
+                    uploaded = await send_file(host, port, upload, timeout=timeout, transfer_id=record.id,
+                                               streams=streams, kind="carrier")
+                metrics.record_transfer("sent", host, uploaded, packets=0)
+                sent += uploaded
+                record.update(carrier_bytes=uploaded)
+            except (OSError, asyncio.TimeoutError, TransferError):
+                pass  # The packet itself was delivered; the next send simply retries the upload
+        return sent
+
+
+def parse_target(target, default_port=DEFAULT_PORT):
+    """Split "host" or "host:port" into (host, port)"""
+    host, _, port = target.strip().partition(":")
+    return host, int(port) if port else default_port
+
+
+def resolve_targets(text, groups=None):
+    """Expand a comma/space separated list of receivers, where a name from groups
+    (the "groups" config section) stands for all of its members. Duplicates are dropped."""
+    targets = []
+    for item in text.replace(",", " ").split():
+        for target in (groups or {}).get(item, [item]):
+            if target not in targets:
+                targets.append(target)
+    return targets
+
+
+async def send_to_many(targets, packet_path, carrier_path=None, port=DEFAULT_PORT, concurrency=None,
+                       on_progress=None, on_stage=None, on_result=None, timeout=CONNECT_TIMEOUT, streams=None):
+    """Deliver one packet to many receivers at once, at most concurrency (default
+    SETTINGS["fanout_concurrency"]) at a time.
+
+    targets are "host" or "host:port" strings. Per target, on_progress(target, sent, total),
+    on_stage(target, stage, nbytes) and on_result(target, exc or None) report the outcome.
+    The packet hash, carrier hash and delta are computed once, and zero-copy sends read the
+    packet from the shared page cache, so it comes off the disk once for all receivers.
+    Returns {target: bytes sent or the exception that failed it}.
+    """
+    semaphore = asyncio.Semaphore(int(concurrency or SETTINGS["fanout_concurrency"]))
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, file_sha256, packet_path)
+
+    async def deliver(plan, target):
+        async with semaphore:
+            try:
+                host, target_port = parse_target(target, port)
+                progress = (lambda done, total: on_progress(target, done, total)) if on_progress else None
+                stage = (lambda name, nbytes: on_stage(target, name, nbytes)) if on_stage else None
+                sent = await send_packet(host, target_port, packet_path, carrier_path, progress, timeout,
+                                         streams=streams, on_stage=stage, plan=plan)
+            except Exception as e:
+                if on_result:
+                    on_result(target, e)
+                return target, e
+        if on_result:
+            on_result(target, None)
+        return target, sent
+
+    with PacketPlan(packet_path, carrier_path) as plan:
+        return dict(await asyncio.gather(*(deliver(plan, target) for target in targets)))
+
+
+# ===================== RECEIVER =====================
+def preallocate(f, size):
+    """Reserve size bytes on disk for an open file"""
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+            return
+        except OSError:
+            pass  # Filesystem without fallocate support
+    f.truncate(size)
+
+
+def read_checkpoint(path, size):
+    """Bytes of a partial file known to be received. While receiving, the file is
+    preallocated to full size, so its "<path>.offset" checkpoint is trusted over its
+    size; without a checkpoint the file was truncated to its real bytes."""
+    try:
+        with open(path + ".offset") as f:
+            return min(int(f.read()), size)
+    except FileNotFoundError:
+        return size
+    except (OSError, ValueError):
+        return 0  # Unreadable checkpoint: start over rather than trust the preallocated size
+
+
+def write_checkpoint(path, offset):
+    """Atomically record offset as the received byte count of a partial file"""
+    with open(path + ".offset.tmp", "w") as f:
+        f.write(str(offset))
+    os.replace(path + ".offset.tmp", path + ".offset")
+
+
+def hash_prefix(path, length):
+    """sha256 object fed with the first length bytes of a file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while length > 0:
+            block = f.read(min(1024 * 1024, length))
+            if not block:
+                break
+            digest.update(block)
+            length -= len(block)
+    return digest
+
+
+async def receive_into_file(conn, f, offset, filesize, on_chunk=None, digest=None, end=None,
+                            on_checkpoint=None):
+    """Receive bytes [offset, end or filesize) straight into a preallocated file.
+
+    The file is memory-mapped so recv_into writes into the page cache without
+    per-chunk allocations; a single reusable buffer is used if mmap is unavailable.
+    Each received slice is fed to digest (a hashlib object) while still in memory.
+    Every CHECKPOINT_INTERVAL seconds the data is flushed to disk and then passed to
+    on_checkpoint(offset), so a crash never loses track of bytes already written.
+    Returns the offset reached, which is short of the end if the peer hung up.
+    """
+    end = filesize if end is None else end
+    sizer = ChunkSizer()
+    loop = asyncio.get_running_loop()
+    last_checkpoint = time.monotonic()
+
+    async def checkpoint(flush):
+        nonlocal last_checkpoint
+        if on_checkpoint and time.monotonic() - last_checkpoint >= CHECKPOINT_INTERVAL:
+            await loop.run_in_executor(None, flush)
+            on_checkpoint(offset)
+            last_checkpoint = time.monotonic()
+
+    try:
+        mapped = mmap.mmap(f.fileno(), filesize)
+    except (OSError, ValueError):
+        mapped = None
+
+    if mapped is not None:
+        with mapped, memoryview(mapped) as view:
+            while offset < end:
+                started = time.perf_counter()
+                with view[offset:min(offset + sizer.size, end)] as window:
+                    n = await conn.read_into(window)
+                    if n and digest:
+                        digest.update(window[:n])
+                if not n:
+                    break
+                sizer.record(n, time.perf_counter() - started)
+                offset += n
+                if on_chunk:
+                    on_chunk(n)
+                await checkpoint(mapped.flush)
+        return offset
+
+    # Fixed-size buffer: the adaptive mode needs the mmap path to grow in place
+    buffer = bytearray(sizer.size)
+    with memoryview(buffer) as view:
+        f.seek(offset)
+        while offset < end:
+            n = await conn.read_into(view[:end - offset])
+            if not n:
+                break
+            f.write(view[:n])
+            if digest:
+                digest.update(view[:n])
+            offset += n
+            if on_chunk:
+                on_chunk(n)
+            await checkpoint(lambda: (f.flush(), os.fsync(f.fileno())))
+    return offset
+
+
+class _Assembly:
+    """Byte ranges of a multi-stream transfer being written into one file"""
+    def __init__(self, path, filesize, streams):
+        self.path = path
+        self.filesize = filesize
+        self.streams = streams
+        self.progress = {}  # (start, end) -> bytes received in that range
+        self.finished = set()
+        self.touched = time.monotonic()  # Last byte received, for expiry
+
+    @property
+    def received(self):
+        return sum(self.progress.values())
+
+    def complete(self):
+        return (len(self.finished) == self.streams
+                and sum(end - start for start, end in self.finished) == self.filesize)
+
+
+class Receiver:
+    """Receives transfers, keeping interrupted ones as partial files keyed by
+    transfer ID and content hash so the sender can resume them"""
+    def __init__(self, received_dir=RECEIVED_DIR, prefix="received_", store=None):
+        self.received_dir = received_dir
+        self.partial_dir = os.path.join(received_dir, "partial")
+        self.carrier_dir = os.path.join(received_dir, "carriers")
+        self.prefix = prefix
+        self.store = store  # pystegano_store.PacketStore, or None for prefixed names
+        self._active = {}  # content hash (or hash + range) -> task currently writing it
+        self._assemblies = {}  # content hash -> _Assembly of a multi-stream transfer
+
+    def _partial_path(self, transfer_id, digest):
+        """Partial file for a transfer, adopting one left by an earlier transfer ID"""
+        path = os.path.join(self.partial_dir, f"{transfer_id}-{digest}.part")
+        if not os.path.exists(path):
+            for name in os.listdir(self.partial_dir):
+                if name.endswith(f"-{digest}.part"):
+                    old_path = os.path.join(self.partial_dir, name)
+                    if os.path.exists(old_path + ".offset"):
+                        os.replace(old_path + ".offset", path + ".offset")
+                    os.replace(old_path, path)
+                    break
+        return path
+
+    def _expire_assemblies(self):
+        """Drop multi-stream transfers idle for SETTINGS["range_ttl"] seconds, and .ranges
+        files no assembly owns any more (left by an earlier run of the receiver)"""
+        ttl = SETTINGS["range_ttl"]
+        now = time.monotonic()
+        writing = {key[0] for key, task in self._active.items() if isinstance(key, tuple) and not task.done()}
+        for digest, assembly in list(self._assemblies.items()):
+            if digest not in writing and now - assembly.touched > ttl:
+                del self._assemblies[digest]
+                if os.path.exists(assembly.path):
+                    os.remove(assembly.path)
+        owned = {assembly.path for assembly in self._assemblies.values()}
+        for name in os.listdir(self.partial_dir):
+            path = os.path.join(self.partial_dir, name)
+            if name.endswith(".ranges") and path not in owned and time.time() - os.path.getmtime(path) > ttl:
+                os.remove(path)
+
+    async def _claim(self, key):
+        """Take over a transfer key, cancelling a stale connection still writing it"""
+        previous = self._active.get(key)
+        if previous and not previous.done():
+            previous.cancel()
+            await asyncio.wait({previous})
+        self._active[key] = asyncio.current_task()
+
+    def _release(self, key):
+        if self._active.get(key) is asyncio.current_task():
+            del self._active[key]
+
+    def _output_path(self, filename):
+        """Reserve an unused name for a received packet, so a new packet never replaces an
+        older one with the same sender filename (received_x.png, received_x_1.png, ...)"""
+        os.makedirs(self.received_dir, exist_ok=True)
+        base, ext = os.path.splitext(self.prefix + filename)
+        for n in itertools.count():
+            path = os.path.join(self.received_dir, f"{base}_{n}{ext}" if n else base + ext)
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL))
+                return path
+            except FileExistsError:
+                continue
+
+    async def _place(self, conn, path, digest, filename):
+        """Move a verified packet to its final location: the content-addressed store when
+        there is one (recording the receipt), else a unique prefixed name"""
+        if self.store:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self.store.add, path, digest, filename, conn.peer)
+        output_path = self._output_path(filename)
+        os.replace(path, output_path)
+        return output_path
+
+    async def _finish(self, conn, filename, filesize, path, actual, expected, kind=None):
+        """Check the hash, then move the partial file into place and acknowledge"""
+        if actual != expected:
+            os.remove(path)
+            await conn.write(f"ERR{SEPARATOR}Checksum mismatch\n".encode())
+            raise TransferError(f"Checksum mismatch (expected {expected[:12]}, got {actual[:12]}), "
+                                f"packet rejected")
+        if kind:
+            return await self._finish_carrier_kind(conn, filename, path, kind)
+        with trace.phase("place"):
+            output_path = await self._place(conn, path, actual, filename)
+        await conn.write(b"OK\n")
+        return output_path, filesize, actual
+
+    async def _finish_carrier_kind(self, conn, filename, path, kind):
+        """Rebuild a delta packet from the carrier cache, or add an uploaded carrier to it"""
+        loop = asyncio.get_running_loop()
+        rebuilt_path = path + ".rebuilt"
+        try:
+            import pystegano_delta  # Pillow/numpy are only needed for delta transfers
+            with trace.phase("rebuild"):
+                if kind == "carrier":
+                    await loop.run_in_executor(None, pystegano_delta.store_carrier, path, self.carrier_dir)
+                else:
+                    await loop.run_in_executor(None, pystegano_delta.apply_delta, path, self.carrier_dir,
+                                               rebuilt_path)
+        except Exception as e:
+            if os.path.exists(rebuilt_path):
+                os.remove(rebuilt_path)
+            reason = str(e).replace("\n", " ")
+            await conn.write(f"ERR{SEPARATOR}{reason}\n".encode())
+            raise TransferError(f"Cannot process {kind}: {e}")
+        finally:
+            os.remove(path)
+        if kind == "carrier":
+            await conn.write(b"OK\n")
+            return None
+        digest = await loop.run_in_executor(None, file_sha256, rebuilt_path)
+        with trace.phase("place"):
+            output_path = await self._place(conn, rebuilt_path, digest, filename)
+        await conn.write(b"OK\n")
+        return output_path, os.path.getsize(output_path), digest
+
+    async def receive(self, conn, on_header=None, on_progress=None):
+        """Receive one file (or one range of it) from an accepted connection.
+
+        on_header(filename, filesize, offset) fires once the resume offset is known.
+        Returns (output_path, filesize, sha256) once a whole packet is verified, or None
+        if the peer closed without a header or delivered a range of an unfinished packet.
+        """
+        line = await conn.read_line()
+        if not line:
+            return None  # Connection probe (e.g. RTT measurement)
+        command, _, value = line.partition(SEPARATOR)
+        if command == "HELLO":
+            await conn.write(f"STEGOVERT{SEPARATOR}{PROTOCOL_VERSION}\n".encode())
+            return None
+        if command == "HAVE":
+            # Same naming as pystegano_delta.carrier_path, without importing Pillow here
+            cached = _is_hex(value) and os.path.exists(os.path.join(self.carrier_dir, f"{value}.png"))
+            await conn.write(b"YES\n" if cached else b"NO\n")
+            return None
+        filename, filesize, fields = parse_header(line)
+        if fields.get("kind") not in (None, "delta", "carrier"):
+            await conn.write(f"ERR{SEPARATOR}Unknown kind\n".encode())
+            raise TransferError(f"Unknown transfer kind {fields['kind']!r}")
+        transfer_id, digest = fields.get("id"), fields.get("sha256")
+        if not (_is_hex(transfer_id) and _is_hex(digest)):
+            await conn.write(f"ERR{SEPARATOR}Missing transfer id or checksum\n".encode())
+            raise TransferError("Header without transfer id or checksum")
+        os.makedirs(self.partial_dir, exist_ok=True)
+        with trace.Trace("receive", transfer_id, peer=conn.peer, sha256=digest, filename=filename,
+                         size=filesize, kind=fields.get("kind"), range=fields.get("range")):
+            if "range" in fields:
+                return await self._receive_range(conn, filename, filesize, transfer_id, digest, fields,
+                                                 on_header, on_progress)
+            return await self._receive_file(conn, filename, filesize, transfer_id, digest, fields,
+                                            on_header, on_progress)
+
+    async def _receive_file(self, conn, filename, filesize, transfer_id, digest, fields, on_header, on_progress):
+        """Receive a whole file over one connection, resuming a partial file of the same content"""
+        await self._claim(digest)
+        try:
+            partial_path = self._partial_path(transfer_id, digest)
+            fd = os.open(partial_path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0))
+            with os.fdopen(fd, "r+b") as f:
+                offset = read_checkpoint(partial_path, min(os.fstat(fd).st_size, filesize))
+                # A resumed partial is hashed once; new bytes are hashed as they arrive
+                streaming = await asyncio.get_running_loop().run_in_executor(
+                    None, hash_prefix, partial_path, offset)
+                await conn.write(f"OFFSET{SEPARATOR}{offset}\n".encode())
+                trace.update(offset=offset)
+                if on_header:
+                    on_header(filename, filesize, offset)
+
+                bytes_received = offset
+
+                def on_chunk(nbytes):
+                    nonlocal bytes_received
+                    bytes_received += nbytes
+                    trace.count(chunks=1, bytes=nbytes)
+                    if on_progress:
+                        on_progress(bytes_received, filesize)
+
+                write_checkpoint(partial_path, offset)  # Before the file grows to its full size
+                preallocate(f, filesize)
+                try:
+                    with trace.phase("transfer"):
+                        await receive_into_file(conn, f, offset, filesize, on_chunk, streaming,
+                                                on_checkpoint=lambda reached: write_checkpoint(partial_path, reached))
+                finally:
+                    if bytes_received < filesize:
+                        f.truncate(bytes_received)  # Keep only real bytes for the resume offset
+                    os.remove(partial_path + ".offset")  # The file size is exact again
+            if bytes_received < filesize:
+                raise TransferError(f"Interrupted at {bytes_received}/{filesize} bytes, partial kept for resume")
+
+            trailer = parse_reply(await conn.read_line(), "SHA256")
+            if trailer != digest:
+                await conn.write(f"ERR{SEPARATOR}Trailer does not match header\n".encode())
+                raise TransferError("Trailer does not match the announced checksum")
+            return await self._finish(conn, filename, filesize, partial_path, streaming.hexdigest(), digest,
+                                      fields.get("kind"))
+        finally:
+            self._release(digest)
+
+    async def _receive_range(self, conn, filename, filesize, transfer_id, digest, fields,
+                             on_header, on_progress):
+        """Write one byte range of a multi-stream transfer at its offset in the shared file.
+
+        Range progress is kept in memory, so ranges resume while this receiver runs. Ranges
+        arrive out of order, so the packet is hashed once after the last range lands.
+        """
+        start, end = (int(value) for value in fields["range"].split("-"))
+        streams = int(fields.get("streams", 1))
+        if not 0 <= start <= end <= filesize:
+            await conn.write(f"ERR{SEPARATOR}Invalid range\n".encode())
+            raise TransferError(f"Invalid range {start}-{end}")
+
+        key = (digest, start, end)
+        await self._claim(key)
+        try:
+            assembly = self._assemblies.get(digest)
+            if assembly is None or (assembly.filesize, assembly.streams) != (filesize, streams):
+                self._expire_assemblies()
+                path = os.path.join(self.partial_dir, f"{transfer_id}-{digest}.ranges")
+                assembly = self._assemblies[digest] = _Assembly(path, filesize, streams)
+                if on_header:
+                    on_header(filename, filesize, 0)
+            offset = start + assembly.progress.get((start, end), 0)
+
+            fd = os.open(assembly.path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0))
+            with os.fdopen(fd, "r+b") as f:
+                if os.fstat(fd).st_size < filesize:
+                    preallocate(f, filesize)
+                await conn.write(f"OFFSET{SEPARATOR}{offset}\n".encode())
+                trace.update(offset=offset)
+
+                def on_chunk(nbytes):
+                    assembly.progress[(start, end)] = assembly.progress.get((start, end), 0) + nbytes
+                    assembly.touched = time.monotonic()
+                    trace.count(chunks=1, bytes=nbytes)
+                    if on_progress:
+                        on_progress(assembly.received, filesize)
+
+                with trace.phase("transfer"):
+                    reached = await receive_into_file(conn, f, offset, filesize, on_chunk, end=end)
+            if reached < end:
+                raise TransferError(f"Range {start}-{end} interrupted at {reached}, kept for resume")
+
+            trailer = parse_reply(await conn.read_line(), "SHA256")
+            if trailer != digest:
+                await conn.write(f"ERR{SEPARATOR}Trailer does not match header\n".encode())
+                raise TransferError("Trailer does not match the announced checksum")
+            assembly.finished.add((start, end))
+            if not assembly.complete():
+                trace.update(complete=False)  # Another connection's record covers the packet
+                await conn.write(b"OK\n")
+                return None
+
+            del self._assemblies[digest]
+            actual = await asyncio.get_running_loop().run_in_executor(None, file_sha256, assembly.path)
+            return await self._finish(conn, filename, filesize, assembly.path, actual, digest, fields.get("kind"))
+        finally:
+            self._release(key)
+
+
+async def serve(host="0.0.0.0", port=DEFAULT_PORT, received_dir=RECEIVED_DIR, prefix="received_",
+                on_connect=None, on_progress=None, on_received=None, on_error=None, on_header=None,
+                max_connections=None, stop=None, drain_timeout=30, store=None, on_listening=None):
+    """Accept transfers until cancelled. Each connection is handled in its own task.
+
+    on_connect(peer), on_header(peer, filename, filesize, offset), on_progress(peer, received, total),
+    on_received(peer, path, filesize, sha256) and on_error(peer, exc) are called from the event loop thread.
+    max_connections caps the transfers handled at once; further senders wait in the listen backlog.
+    Setting the stop event (asyncio.Event) closes the listener, gives running transfers up to
+    drain_timeout seconds to finish and returns; interrupted ones keep their partial files.
+    With a store (pystegano_store.PacketStore) packets are filed under their content hash.
+    on_listening(host, port) reports the bound address, e.g. the port picked for port=0.
+    """
+    loop = asyncio.get_running_loop()
+    receiver = Receiver(received_dir, prefix, store)
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    apply_socket_options(server_socket)  # Inherited by accepted sockets (before listen for window scaling)
+    server_socket.bind((host, port))
+    server_socket.listen(128)
+    server_socket.setblocking(False)
+    if on_listening:
+        on_listening(*server_socket.getsockname()[:2])
+
+    async def handle(client_socket, address):
+        conn = Connection(client_socket, address[0])
+        started = time.perf_counter()
+        try:
+            if on_connect:
+                on_connect(conn.peer)
+            header = (lambda *info: on_header(conn.peer, *info)) if on_header else None
+            progress = (lambda done, total: on_progress(conn.peer, done, total)) if on_progress else None
+            result = await receiver.receive(conn, header, progress)
+            if result:
+                metrics.observe("receive", time.perf_counter() - started)
+                metrics.record_transfer("received", conn.peer, result[1])
+            if result and on_received:
+                on_received(conn.peer, *result)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if on_error:
+                on_error(conn.peer, e)
+        finally:
+            conn.close()
+
+    tasks = set()
+    limit = asyncio.Semaphore(max_connections) if max_connections else None
+
+    async def accept_loop():
+        while True:
+            if limit:
+                await limit.acquire()
+            try:
+                client_socket, address = await loop.sock_accept(server_socket)
+            except BaseException:
+                if limit:
+                    limit.release()
+                raise
+            task = loop.create_task(handle(client_socket, address))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            if limit:
+                task.add_done_callback(lambda _: limit.release())
+
+    try:
+        if stop is None:
+            await accept_loop()
+        acceptor = loop.create_task(accept_loop())
+        stopped = loop.create_task(stop.wait())
+        try:
+            await asyncio.wait({acceptor, stopped}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            acceptor.cancel()
+            stopped.cancel()
+        await asyncio.wait({acceptor, stopped})
+        if not acceptor.cancelled():
+            acceptor.result()  # accept() failed
+        server_socket.close()
+        if tasks:
+            await asyncio.wait(set(tasks), timeout=drain_timeout)
+    finally:
+        server_socket.close()
+        for task in tasks:
+            task.cancel()
+
+
+async def receive_once(host="0.0.0.0", port=DEFAULT_PORT, received_dir=RECEIVED_DIR, prefix="received_",
+                       on_connect=None, on_progress=None, on_error=None):
+    """Listen until a single file has been received and verified.
+
+    Failed or interrupted transfers are reported through on_error(peer, exc) and the
+    receiver keeps listening so the sender can resume. Returns (output_path, filesize, sha256).
+    """
+    result = asyncio.get_running_loop().create_future()
+
+    def received(peer, path, filesize, digest):
+        if not result.done():
+            result.set_result((path, filesize, digest))
+
+    server = asyncio.ensure_future(serve(host, port, received_dir, prefix, on_connect, on_progress,
+                                         received, on_error))
+    try:
+        done, _ = await asyncio.wait({server, result}, return_when=asyncio.FIRST_COMPLETED)
+        if server in done:
+            server.result()  # bind/listen error
+        return result.result()
+    finally:
+        server.cancel()
+        try:
+            await server
+        except (asyncio.CancelledError, Exception):
+            pass
+
+
+# ===================== BACKGROUND LOOP =====================
+class TransportLoop:
+    """Runs one asyncio event loop in a background thread for GUI use"""
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="stegovert-transport")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, coro):
+        """Schedule a coroutine on the loop, returning a concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)